@@ -0,0 +1,147 @@
+"""Time every pipeline stage on synthetic data at increasing scales.
+
+    python benchmarks/run_benchmarks.py --scales 10 100 1000 --out bench.json
+
+A scale is a multiple of the regulator's current register (about 14,000
+charities), so the default runs 10x, 100x and 1000x today's files; fractional
+scales such as ``0.1 1`` make a quick run. For each scale the synthetic CSVs
+are generated once into a work directory, then the load, clean, merge and
+Q1-Q12 stages run ``--repeat`` times and the fastest time of each stage is
+kept. Between consecutive scales the growth exponent of each stage's time is
+reported; anything well above 1 is super-linear and flagged.
+
+``--years 2014-2022`` answers the questions for every reporting year at once
+instead of for ``--year``, and ``--parallel`` (with ``--workers N``) takes the
+concurrent fetch, load and clean path of ``run --parallel``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from synthetic import write_annual_reports, write_register
+
+from irish_charities.analyse import analyse
+from irish_charities.download import ANNUAL_REPORTS_URL, REGISTER_URL, DownloadCache
+from irish_charities.merge import add_derived_columns, merge
+from irish_charities.multiyear import analyse_by_year
+from irish_charities.period import ReportingPeriod, ReportingYears
+from irish_charities.pipeline import Period, Sources, load_clean, load_clean_parallel
+from irish_charities.profiling import Profiler
+
+REGISTER_CHARITIES = 14_000
+SUPER_LINEAR = 1.2
+
+
+def run_once(
+    cache: DownloadCache, period: Period, parallel: bool = False, workers: Optional[int] = None
+) -> Profiler:
+    profiler = Profiler()
+    if parallel:
+        with profiler.stage("fetch, load and clean in parallel"):
+            _, file_1, file_2 = load_clean_parallel(period, cache, workers=workers)
+    else:
+        sources = Sources(cache.path_for(REGISTER_URL), cache.path_for(ANNUAL_REPORTS_URL))
+        file_1, file_2 = load_clean(sources, period, profiler=profiler, workers=workers)
+    with profiler.stage("merge") as stage:
+        file_3 = add_derived_columns(merge(file_1, file_2))
+        stage.frame(file_3)
+    if isinstance(period, ReportingYears):
+        analyse_by_year(file_3, profiler)
+    else:
+        analyse(file_3, profiler)
+    return profiler
+
+
+def synthetic_cache(scale: float, work_dir: Path) -> DownloadCache:
+    """An offline download cache holding synthetic CSVs at ``scale`` times today's size."""
+    cache = DownloadCache(work_dir / f"x{scale:g}", offline=True)
+    cache.directory.mkdir(parents=True, exist_ok=True)
+    charities, seed = max(1, round(scale * REGISTER_CHARITIES)), round(scale * 100)
+    for url, write in [(REGISTER_URL, write_register), (ANNUAL_REPORTS_URL, write_annual_reports)]:
+        if not cache.metadata(url):
+            write(cache.path_for(url), charities, seed=seed)
+            cache._write_meta(url, {"url": url, "fetched_at": f"synthetic x{scale:g}"})
+    return cache
+
+
+def bench_scale(
+    scale: float, work_dir: Path, period: Period, repeat: int, parallel: bool = False, workers: Optional[int] = None
+) -> Dict[str, float]:
+    cache = synthetic_cache(scale, work_dir)
+    best: Dict[str, float] = {}
+    for _ in range(repeat):
+        for record in run_once(cache, period, parallel, workers).records:
+            best[record.name] = min(best.get(record.name, math.inf), record.wall_seconds)
+    best["total"] = sum(best.values())
+    return best
+
+
+def growth(results: Dict[float, Dict[str, float]]) -> List[dict]:
+    """Growth exponent of each stage between consecutive scales."""
+    rows = []
+    scales = sorted(results)
+    for small, large in zip(scales, scales[1:]):
+        for stage, seconds in results[large].items():
+            before = results[small].get(stage)
+            if not before or not seconds:
+                continue
+            exponent = math.log(seconds / before) / math.log(large / small)
+            rows.append(
+                {
+                    "stage": stage,
+                    "from": small,
+                    "to": large,
+                    "exponent": exponent,
+                    "super_linear": exponent > SUPER_LINEAR,
+                }
+            )
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scales", type=float, nargs="+", default=[10, 100, 1000], help="multiples of today's register"
+    )
+    parser.add_argument("--year", type=int, default=2021)
+    parser.add_argument("--years", type=ReportingYears.parse, metavar="FIRST-LAST", help="every year of a span")
+    parser.add_argument("--parallel", action="store_true", help="fetch, load and clean both files concurrently")
+    parser.add_argument("--workers", type=int, metavar="N", help="clean the reports file in N processes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--work-dir", type=Path, help="keep generated CSVs here between runs")
+    parser.add_argument("--out", type=Path, help="write the results as JSON")
+    args = parser.parse_args(argv)
+
+    period = args.years or ReportingPeriod.calendar_year(args.year)
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = args.work_dir or Path(tmp)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        results = {}
+        for scale in args.scales:
+            results[scale] = bench_scale(scale, work_dir, period, args.repeat, args.parallel, args.workers)
+            print(f"scale x{scale:g}: {results[scale]['total']:.3f}s", file=sys.stderr)
+
+    stages = list(results[args.scales[0]])
+    width = max(len(stage) for stage in stages)
+    print("stage".ljust(width) + "".join(f"{f'x{scale:g}':>12}" for scale in args.scales))
+    for stage in stages:
+        print(stage.ljust(width) + "".join(f"{results[scale].get(stage, math.nan):>12.4f}" for scale in args.scales))
+    flagged = [row for row in growth(results) if row["super_linear"]]
+    for row in flagged:
+        print(f"super-linear: {row['stage']} x{row['from']:g} -> x{row['to']:g}: exponent {row['exponent']:.2f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"results": results, "growth": growth(results)}, fh, indent=2)
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Synthetic stand-ins for the two Charities Regulator CSV files.
+
+The generated files copy the layout of the real downloads byte for byte where
+it matters to the pipeline:
+
+* register-of-charities.csv: an "Effective Date" banner row, the 10 named
+  columns plus an empty trailing column, ISO-8859-1 text with accented
+  names, multi-line "Charitable Objects", and the comma-only padding rows
+  that take the real file to about 75 times its number of charities;
+* charity-annual-reports.csv: the banner row, header names containing
+  newlines, 16 used columns followed by three unused and two empty ones,
+  dd/mm/yyyy period dates (mostly calendar years, some July-June financial
+  years) and amounts written as "€1,234,567" in Windows-1252, with blanks.
+
+Sizes are given as a number of charities; each charity files a report for
+most of the years requested. Rows are written out in batches, so files many
+times the size of the real ones can be generated without holding them in
+memory.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import os
+import random
+from typing import Sequence
+
+ENCODING = "cp1252"
+
+STATUSES = ["Registered", "Registered", "Registered", "Deregistered"]
+GOVERNING_FORMS = [
+    "CLG - Company Limited by Guarantee",
+    "Company Limited by Guarantee",
+    "Association",
+    "Trust",
+    "Board of Management (Primary School)",
+    "Unincorporated Association",
+    "Other",
+]
+COUNTRIES = [
+    "Ireland",
+    "Ireland",
+    "Ireland",
+    "Republic of Ireland",
+    "Republic Of Ireland",
+    "Poblacht na hÉireann",
+    "Northern Ireland",
+    "United Kingdom",
+]
+PURPOSES = [
+    "Advancement of education",
+    "Advancement of religion",
+    "Relief of poverty or economic hardship",
+    "Other purpose that is of benefit to the community",
+    "Promotion of health, including the prevention or relief of sickness, disease or human suffering",
+]
+BENEFICIARIES = [
+    "Children",
+    "Carers",
+    "Community services",
+    "Family services",
+    "Older people",
+    "People experiencing homelessness",
+    "People with disabilities",
+    "Young people",
+]
+WORDS = (
+    "support provide community education health homeless children families local national "
+    "services relief poverty promote develop research care sport culture heritage rural"
+).split()
+
+REGISTER_HEADER = [
+    "Registered Charity Number",
+    "Registered Charity Name",
+    "Status",
+    "Also Known As",
+    "Primary Address",
+    "Governing Form",
+    "CRO Number",
+    "Country Established",
+    "Charitable Purpose",
+    "Charitable Objects",
+    "",
+]
+REPORTS_HEADER = [
+    "Registered\nCharity\nNumber",
+    "Registered Charity Name",
+    "Period\nStart Date",
+    "Period\nEnd Date",
+    "Report Activity",
+    "Activity Description",
+    "Beneficiaries",
+    "Financial: Income from Central Government or Local Authorities",
+    "Financial: Income from other public bodies",
+    "Financial: Income from philantrophic organisations",
+    "Financial: Income from donations",
+    "Financial: Income from bequests",
+    "Financial: Income from trading and commercial activities",
+    "Financial: Income from other sources",
+    "Financial: Gross Income",
+    "Financial: Gross Expenditure",
+    "Number of Employees",
+    "Number of Volunteers",
+    "Financial: Total Assets",
+    "",
+    "",
+]
+
+PADDING_PER_CHARITY = 75
+FIRST_NUMBER = 20000000
+BATCH = 10_000
+PADDING_ROW = b",,,,,,,,,,\r\n"
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _flush(buffer: io.StringIO, fh) -> None:
+    fh.write(buffer.getvalue().encode(ENCODING))
+    buffer.seek(0)
+    buffer.truncate()
+
+
+def _amount(rng: random.Random, scale: float, blank: float = 0.4) -> str:
+    if rng.random() < blank:
+        return ""
+    return f"€{int(rng.lognormvariate(10, 2.5) * scale):,}"
+
+
+def _register_row(writer, rng: random.Random, number: int) -> None:
+    name = f"{_text(rng, 3).title()} Café {number}"
+    writer.writerow(
+        [
+            number,
+            name,
+            rng.choice(STATUSES),
+            f"{name}; {_text(rng, 2).title()}",
+            "" if rng.random() < 0.02 else f"{rng.randint(1, 99)} Main Street, Co. Cork, Ireland",
+            rng.choice(GOVERNING_FORMS),
+            str(rng.randint(100000, 999999)) if rng.random() < 0.4 else "",
+            rng.choice(COUNTRIES),
+            "" if rng.random() < 0.01 else "; ".join(rng.sample(PURPOSES, rng.randint(1, 3))),
+            "" if rng.random() < 0.15 else f"{_text(rng, 12)}\n{_text(rng, 20)}",
+            "",
+        ]
+    )
+
+
+def write_register(path: os.PathLike, charities: int, seed: int = 0, padding: bool = True) -> None:
+    """Write a synthetic register-of-charities.csv with ``charities`` rows."""
+    rng = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerow(["Effective Date", "Sunday 4 December 2022"] + [""] * 9)
+    writer.writerow(REGISTER_HEADER)
+    with open(path, "wb") as fh:
+        for i in range(charities):
+            if i and i % BATCH == 0:
+                _flush(buffer, fh)
+            _register_row(writer, rng, FIRST_NUMBER + i)
+        _flush(buffer, fh)
+        if padding:
+            for start in range(0, charities * PADDING_PER_CHARITY, BATCH * PADDING_PER_CHARITY):
+                fh.write(PADDING_ROW * min(BATCH * PADDING_PER_CHARITY, charities * PADDING_PER_CHARITY - start))
+
+
+def write_annual_reports(
+    path: os.PathLike, charities: int, years: Sequence[int] = range(2014, 2023), seed: int = 0
+) -> None:
+    """Write a synthetic charity-annual-reports.csv for ``charities`` charities."""
+    rng = random.Random(seed)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerow(["Effective Date", "Sunday 4 December 2022"] + [""] * 19)
+    writer.writerow(REPORTS_HEADER)
+    with open(path, "wb") as fh:
+        for i in range(charities):
+            if i and i % BATCH == 0:
+                _flush(buffer, fh)
+            _report_rows(writer, rng, FIRST_NUMBER + i, years)
+        _flush(buffer, fh)
+
+
+def _report_rows(writer, rng: random.Random, number: int, years: Sequence[int]) -> None:
+    name = f"Charity {number}"
+    financial_year = rng.random() < 0.1
+    size = rng.lognormvariate(0, 1.5)
+    beneficiaries = "; ".join(rng.sample(BENEFICIARIES, rng.randint(1, 4)))
+    activity = rng.choice(PURPOSES)
+    for year in years:
+        if rng.random() < 0.35:
+            continue
+        if financial_year:
+            start, end = f"01/07/{year - 1}", f"30/06/{year}"
+        else:
+            start, end = f"01/01/{year}", f"31/12/{year}"
+        gross_income = _amount(rng, size, blank=0.1)
+        writer.writerow(
+            [number, name, start, end, f'"{activity}"', f"{_text(rng, 10)}\n{_text(rng, 8)}", beneficiaries]
+            + [_amount(rng, size) for _ in range(7)]
+            + [gross_income, _amount(rng, size, blank=0.1), rng.randint(0, 50), rng.randint(0, 200), "", "", ""]
+        )
@@ -0,0 +1,58 @@
+"""Financial performance of Irish charities, from the Charities Regulator data.
+
+The notebook in the repository root walks through the analysis step by step;
+this package holds the reusable pieces of that pipeline.
+"""
+
+from .clean import clean_annual_reports, clean_register
+from .cube import AggregateCube
+from .currency import parse_currency, parse_currency_columns
+from .dates import parse_date_columns, parse_dates
+from .download import ANNUAL_REPORTS_URL, REGISTER_URL, DownloadCache, fetch
+from .financials import FinancialBlock
+from .load import read_annual_reports, read_register
+from .multivalue import MultiValued, funds_by_category
+from .outliers import flag_outliers, iqr_fences, outlier_sets, winsorise
+from .period import ReportingPeriod, ReportingYears
+from .profiling import Profiler
+from .search import NameIndex
+from .snapshot import SnapshotStore
+from .textindex import TextIndex, text_indexes, text_postings
+from .topn import Ranking, TopN, stream_top_n, top_n
+
+__version__ = "0.1.0"
+
+__all__ = [
+    "ANNUAL_REPORTS_URL",
+    "REGISTER_URL",
+    "AggregateCube",
+    "DownloadCache",
+    "FinancialBlock",
+    "MultiValued",
+    "NameIndex",
+    "Profiler",
+    "Ranking",
+    "ReportingPeriod",
+    "ReportingYears",
+    "SnapshotStore",
+    "TextIndex",
+    "TopN",
+    "clean_annual_reports",
+    "clean_register",
+    "fetch",
+    "flag_outliers",
+    "funds_by_category",
+    "iqr_fences",
+    "outlier_sets",
+    "parse_currency",
+    "parse_currency_columns",
+    "parse_date_columns",
+    "parse_dates",
+    "read_annual_reports",
+    "read_register",
+    "stream_top_n",
+    "text_indexes",
+    "text_postings",
+    "top_n",
+    "winsorise",
+]
@@ -0,0 +1,199 @@
+"""The twelve questions of Part 3 of the notebook.
+
+Each ``qN`` function takes the merged frame (with the derived columns from
+:func:`~irish_charities.merge.add_derived_columns`) and returns a scalar, a
+Series, a DataFrame, or a dict of those for questions with several parts.
+The "Top 5" questions (Q2-Q5 and Q7) also accept the rankings computed by
+:func:`~irish_charities.topn.top_n`, and the group-by questions (Q8-Q10 and
+Q12) an :class:`~irish_charities.cube.AggregateCube`; :func:`analyse` builds
+both once and answers those questions from them. Given the merged frame too,
+Q8 and Q9 also credit every listed beneficiary or purpose, not only the
+first (see :func:`~irish_charities.multivalue.funds_by_category`). Q1 is the
+exact, in-cents total of the :class:`~irish_charities.financials.FinancialBlock`
+that :func:`analyse` builds once.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import pandas as pd
+
+from .columns import CHARITY_NAME, CHARITY_NUMBER, MEASURES
+from .cube import CUBE_MEASURES, AggregateCube, count_of
+from .financials import FinancialBlock
+from .merge import CHARITY_PURPOSE, LEAD_BENEFICIARY, NET_INCOME
+from .multivalue import MultiValued, funds_by_category
+from .outliers import iqr_fences, outlier_sets
+from .profiling import Profiler
+from .topn import Ranking, top_n
+
+TOP_N = 5
+
+# Columns shown for the charities in the "Top 5" answers.
+SUMMARY_COLUMNS = [CHARITY_NUMBER, CHARITY_NAME, "Governing Form", "Country Established"] + MEASURES + [NET_INCOME]
+
+
+def q1_total_gross_income(data: Union[pd.DataFrame, FinancialBlock]) -> float:
+    block = data if isinstance(data, FinancialBlock) else FinancialBlock.from_frame(data, ["Total Gross Income"])
+    return float(block.totals()["Total Gross Income"])
+
+
+# The rankings behind the "Top 5" questions, computed together by analyse().
+RANKINGS = {
+    "q02": Ranking("Total Gross Income"),
+    "q03": Ranking("Total Gross Expenditure"),
+    "q04": Ranking(NET_INCOME),
+    "q05": Ranking(NET_INCOME, ascending=True),
+    "q07": Ranking("Income: Donations"),
+}
+
+Rankings = Dict[Ranking, pd.DataFrame]
+
+
+def _leaders(data: Union[pd.DataFrame, Rankings], ranking: Ranking) -> pd.DataFrame:
+    rankings = top_n(data, [ranking], n=TOP_N) if isinstance(data, pd.DataFrame) else data
+    return rankings[ranking][SUMMARY_COLUMNS]
+
+
+def q2_top_gross_income(data: Union[pd.DataFrame, Rankings]) -> pd.DataFrame:
+    return _leaders(data, RANKINGS["q02"])
+
+
+def q3_top_gross_expenditure(data: Union[pd.DataFrame, Rankings]) -> pd.DataFrame:
+    return _leaders(data, RANKINGS["q03"])
+
+
+def q4_top_net_income(data: Union[pd.DataFrame, Rankings]) -> pd.DataFrame:
+    return _leaders(data, RANKINGS["q04"])
+
+
+def q5_bottom_net_income(data: Union[pd.DataFrame, Rankings]) -> pd.DataFrame:
+    return _leaders(data, RANKINGS["q05"])
+
+
+def q6_no_gross_income(file_3: pd.DataFrame) -> int:
+    return int((file_3["Total Gross Income"] == 0).sum())
+
+
+def q7_top_donations(data: Union[pd.DataFrame, Rankings]) -> pd.DataFrame:
+    return _leaders(data, RANKINGS["q07"])
+
+
+def _cube(data: Union[pd.DataFrame, AggregateCube]) -> AggregateCube:
+    return data if isinstance(data, AggregateCube) else AggregateCube.from_frame(data)
+
+
+def _top_groups(data: Union[pd.DataFrame, AggregateCube], by: str) -> Dict[str, pd.DataFrame]:
+    cube = _cube(data)
+    counted = count_of("Total Gross Expenditure")
+    count = cube.top(by, counted, n=TOP_N).rename(columns={counted: "Total Gross Expenditure"})
+    amount = cube.top(by, "Total Gross Expenditure", n=TOP_N)
+    return {"count": count, "amount": amount}
+
+
+def all_listed(file_3: pd.DataFrame, column: str, by: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+    """Expenditure credited to every entry listed in ``column``, in full and split equally."""
+    matrix = MultiValued.from_series(file_3[column])
+    return {
+        "all_listed": funds_by_category(file_3, column, by=by, matrix=matrix),
+        "all_listed_split": funds_by_category(file_3, column, split=True, by=by, matrix=matrix),
+    }
+
+
+def _top_and_listed(
+    data: Union[pd.DataFrame, AggregateCube], file_3: Optional[pd.DataFrame], by: str, column: str
+) -> Dict[str, pd.DataFrame]:
+    parts = _top_groups(data, by)
+    file_3 = data if isinstance(data, pd.DataFrame) else file_3
+    if file_3 is not None:
+        parts.update(all_listed(file_3, column))
+    return parts
+
+
+def q8_top_beneficiaries(
+    data: Union[pd.DataFrame, AggregateCube], file_3: Optional[pd.DataFrame] = None
+) -> Dict[str, pd.DataFrame]:
+    return _top_and_listed(data, file_3, LEAD_BENEFICIARY, "Beneficiaries")
+
+
+def q9_top_purposes(
+    data: Union[pd.DataFrame, AggregateCube], file_3: Optional[pd.DataFrame] = None
+) -> Dict[str, pd.DataFrame]:
+    return _top_and_listed(data, file_3, CHARITY_PURPOSE, "Charitable Purpose")
+
+
+def q10_top_governing_forms(data: Union[pd.DataFrame, AggregateCube]) -> Dict[str, pd.DataFrame]:
+    return _top_groups(data, "Governing Form")
+
+
+def q11_gross_income_outliers(file_3: pd.DataFrame) -> Dict[str, Any]:
+    """IQR fences for ``Total Gross Income`` and the charities outside them."""
+    columns = ["Total Gross Income"]
+    fences = iqr_fences(file_3, columns)
+    outliers = file_3.loc[outlier_sets(file_3, columns, fences=fences)["Total Gross Income"], SUMMARY_COLUMNS]
+    return {"limits": fences.loc["Total Gross Income"], "outliers": outliers}
+
+
+def q12_by_country(data: Union[pd.DataFrame, AggregateCube]) -> pd.DataFrame:
+    return _cube(data).rollup(["Country Established"])[CUBE_MEASURES]
+
+
+class Question(NamedTuple):
+    title: str
+    answer: Callable[[Any], Any]
+    # What the answer is computed from: the merged frame ("rows"), the
+    # "rankings" of the Top 5 questions, the aggregate "cube" or the
+    # financial "block"; a tuple
+    # passes several of them, in order.
+    source: Union[str, Tuple[str, ...]] = "rows"
+
+    def inputs(self, sources: Dict[str, Any]) -> List[Any]:
+        names = (self.source,) if isinstance(self.source, str) else self.source
+        return [sources[name] for name in names]
+
+
+QUESTIONS: Dict[str, Question] = {
+    "q01": Question("What is Total Gross Income for all charities?", q1_total_gross_income, source="block"),
+    "q02": Question("Top 5 charities with the highest Total Gross Income", q2_top_gross_income, source="rankings"),
+    "q03": Question(
+        "Top 5 charities with the highest Total Gross Expenditure", q3_top_gross_expenditure, source="rankings"
+    ),
+    "q04": Question("Top 5 charities with the highest Total Net Income", q4_top_net_income, source="rankings"),
+    "q05": Question("Top 5 charities with the lowest Total Net Income", q5_bottom_net_income, source="rankings"),
+    "q06": Question("How many charities did not have any gross income?", q6_no_gross_income),
+    "q07": Question("Top 5 charities with the highest donations", q7_top_donations, source="rankings"),
+    "q08": Question(
+        "Top 5 Beneficiaries and the funds dedicated to support them", q8_top_beneficiaries, source=("cube", "rows")
+    ),
+    "q09": Question("Top 5 charities based on their main purpose", q9_top_purposes, source=("cube", "rows")),
+    "q10": Question("Top 5 charities based on their governing form", q10_top_governing_forms, source="cube"),
+    "q11": Question("Total Gross Income - outliers based on IQR", q11_gross_income_outliers),
+    "q12": Question(
+        "Incomes and spendings by country where the charity was established", q12_by_country, source="cube"
+    ),
+}
+
+
+def analyse(
+    file_3: pd.DataFrame, profiler: Optional[Profiler] = None, block: Optional[FinancialBlock] = None
+) -> Dict[str, Any]:
+    """Answer every question in :data:`QUESTIONS`, keyed by question id.
+
+    ``block`` is the :class:`FinancialBlock` of ``file_3``, if it was
+    already built.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    if block is None:
+        with profiler.stage("financial block"):
+            block = FinancialBlock.from_frame(file_3)
+    with profiler.stage("top-n rankings"):
+        rankings = top_n(file_3, RANKINGS.values(), n=TOP_N, columns=SUMMARY_COLUMNS)
+    with profiler.stage("aggregate cube"):
+        cube = AggregateCube.from_frame(file_3)
+    sources = {"rows": file_3, "rankings": rankings, "cube": cube, "block": block}
+    results = {}
+    for key, question in QUESTIONS.items():
+        with profiler.stage(f"analyse {key}"):
+            results[key] = question.answer(*question.inputs(sources))
+    return results
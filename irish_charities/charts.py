@@ -0,0 +1,104 @@
+"""Charts from Part 2 and Q11 of the notebook, saved as PNG files.
+
+matplotlib and seaborn are only imported when a chart is drawn, so runs that
+compute the numbers alone never pay for them. Unless ``headless=False`` is
+passed, the non-interactive Agg backend is selected before pyplot is first
+imported, so no GUI toolkit is loaded either.
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .columns import MEASURES
+from .financials import FinancialBlock
+from .outliers import winsorise
+from .profiling import Profiler
+
+
+def _plotting(headless: bool = True):
+    import matplotlib
+
+    if headless and "matplotlib.pyplot" not in sys.modules:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    return plt, sns
+
+
+def financials_boxplot(block: FinancialBlock, path: Path, headless: bool = True) -> Path:
+    """One boxplot per financial measure, side by side (notebook cell 78)."""
+    plt, _ = _plotting(headless)
+    fig, ax = plt.subplots(figsize=(16, 6))
+    ax.bxp(block.box_stats(MEASURES))
+    ax.set_xticks(range(1, len(MEASURES) + 1), MEASURES, rotation=30, ha="right")
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def measure_boxplots(file_3: pd.DataFrame, path: Path, headless: bool = True) -> Path:
+    """A separate boxplot for each financial measure (notebook cells 79-80)."""
+    plt, sns = _plotting(headless)
+    fig, axes = plt.subplots(2, 4, figsize=(20, 8))
+    for ax, measure in zip(axes.flat, MEASURES):
+        sns.boxplot(x=file_3[measure], ax=ax)
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def gross_income_distribution(income: pd.Series, path: Path, headless: bool = True) -> Path:
+    """Histogram and boxplot of ``Total Gross Income`` (notebook cells 112 and 124)."""
+    plt, sns = _plotting(headless)
+    fig, (left, right) = plt.subplots(1, 2, figsize=(16, 4))
+    sns.histplot(income, kde=True, ax=left)
+    sns.boxplot(x=income, ax=right)
+    fig.tight_layout()
+    fig.savefig(path, dpi=100)
+    plt.close(fig)
+    return path
+
+
+def write_charts(
+    file_3: pd.DataFrame,
+    results: Dict[str, Any],
+    out_dir: os.PathLike,
+    headless: bool = True,
+    profiler: Optional[Profiler] = None,
+    block: Optional[FinancialBlock] = None,
+) -> List[Path]:
+    """Draw every chart into ``out_dir``; ``results`` supplies the Q11 limits.
+
+    ``block`` is the :class:`FinancialBlock` of ``file_3`` the financials
+    boxplot is drawn from; it is built if not given.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    if block is None:
+        with profiler.stage("financial block"):
+            block = FinancialBlock.from_frame(file_3)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    income = file_3["Total Gross Income"]
+    # Q11's fences, as the one-row fences frame winsorise() takes.
+    fences = pd.DataFrame([results["q11"]["limits"]])
+    capped = winsorise(file_3, ["Total Gross Income"], fences=fences, inplace=False)["Total Gross Income"]
+    charts = [
+        ("financials_boxplot", financials_boxplot, block),
+        ("measure_boxplots", measure_boxplots, file_3),
+        ("gross_income", gross_income_distribution, income),
+        ("gross_income_capped", gross_income_distribution, capped),
+    ]
+    written = []
+    for name, draw, data in charts:
+        with profiler.stage(f"chart {name}"):
+            written.append(draw(data, out_dir / f"{name}.png", headless))
+    return written
@@ -0,0 +1,110 @@
+"""Cleaning steps for File 1 (register) and File 2 (annual reports).
+
+These follow Part 1 of the notebook: string types for the text columns and
+categoricals for the low-cardinality ones, empty rows dropped, missing text
+replaced by "", the Irish country-name variants folded into "Ireland",
+report dates parsed (see :mod:`.dates`; the reporting year is taken from
+the end date) and the euro amounts turned into floats (see :mod:`.currency`).
+
+Every step converts or fills one column at a time and assigns it back, so
+only that column is ever held twice; empty and duplicate rows are found with
+one mask and removed with a single row selection, skipped when nothing is
+dropped. With ``inplace=True`` the columns of the raw frame itself are
+replaced, so each raw column is freed as soon as its cleaned version exists
+(the caller must not use the raw frame afterwards); otherwise the raw frame
+is left untouched, at the cost of a shallow copy, which copy-on-write keeps
+from ever copying data.
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from .columns import (
+    AMOUNT_COLUMNS,
+    CHARITY_NUMBER,
+    IRELAND_SYNONYMS,
+    PERIOD_END,
+    PERIOD_START,
+    REGISTER_CATEGORIES,
+    REGISTER_COLUMNS,
+    REPORTING_YEAR,
+    REPORT_CATEGORIES,
+    REPORT_HEADER_RENAMES,
+    REPORT_TEXT_COLUMNS,
+)
+from .currency import parse_currency_columns
+from .dates import parse_date_columns
+
+
+def merge_categories(values: pd.Series, mapping: Dict[str, str]) -> pd.Series:
+    """Rename categories of ``values`` per ``mapping``, merging any that collide.
+
+    Only the categories are rewritten; the rows just get their codes remapped.
+    """
+    values = values.astype("category")
+    renamed = values.cat.categories.to_series().replace(mapping)
+    categories = pd.Index(renamed.unique()).sort_values()
+    new_codes = np.append(categories.get_indexer(renamed), -1)
+    codes = new_codes[values.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codes, categories), index=values.index, name=values.name)
+
+
+def _astype_columns(frame: pd.DataFrame, dtypes: Dict[str, str]) -> None:
+    for column, dtype in dtypes.items():
+        frame[column] = frame[column].astype(dtype)
+
+
+def clean_register(file_1: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    """Return the cleaned register frame (File 1).
+
+    With ``inplace`` the columns of ``file_1`` are converted in place.
+    """
+    file_1 = file_1 if inplace else file_1.copy(deep=False)
+    text_columns = [
+        column for column in REGISTER_COLUMNS if column != CHARITY_NUMBER and column not in REGISTER_CATEGORIES
+    ]
+    _astype_columns(
+        file_1, {**{column: "string" for column in text_columns}, **dict.fromkeys(REGISTER_CATEGORIES, "category")}
+    )
+    keep = ~file_1.duplicated().to_numpy() & file_1.notna().any(axis=1).to_numpy()
+    if not keep.all():
+        file_1 = file_1[keep]
+    for column in ["Primary Address", "CRO Number", "Charitable Purpose", "Charitable Objects"]:
+        file_1[column] = file_1[column].fillna("")
+    file_1["Country Established"] = merge_categories(
+        file_1["Country Established"], dict.fromkeys(IRELAND_SYNONYMS, "Ireland")
+    )
+    return file_1
+
+
+def clean_annual_reports(file_2: pd.DataFrame, inplace: bool = False) -> pd.DataFrame:
+    """Return the cleaned annual-reports frame (File 2), all periods.
+
+    Reports without a valid period end date have no reporting year and are
+    dropped, with a warning. With ``inplace`` the columns of ``file_2`` are
+    converted in place.
+    """
+    file_2 = file_2 if inplace else file_2.copy(deep=False)
+    file_2.rename(columns=REPORT_HEADER_RENAMES, inplace=True)
+    _astype_columns(
+        file_2, {**{column: "string" for column in REPORT_TEXT_COLUMNS}, **dict.fromkeys(REPORT_CATEGORIES, "category")}
+    )
+    parse_date_columns(file_2, [PERIOD_START, PERIOD_END])
+    undated = file_2[PERIOD_END].isna().to_numpy()
+    if undated.any():
+        # No reporting year, so no period could ever select them.
+        examples = file_2.loc[undated, CHARITY_NUMBER].unique()[:5].tolist()
+        warnings.warn(
+            f"{undated.sum()} annual reports have no valid period end date and were dropped, "
+            f"e.g. for charities {examples}",
+            stacklevel=2,
+        )
+        file_2 = file_2.loc[~undated]
+    file_2[REPORTING_YEAR] = file_2[PERIOD_END].dt.year.astype("int16")
+    parse_currency_columns(file_2, AMOUNT_COLUMNS, fill_value=0)
+    return file_2
@@ -0,0 +1,191 @@
+"""Command line entry point: ``irish-charities run --year 2021 --out results``."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from .download import DownloadCache
+from .period import ReportingPeriod, ReportingYears
+from .pipeline import enable_copy_on_write, run, run_incremental
+from .profiling import Profiler
+from .snapshot import SnapshotStore
+
+
+def _add_source_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--cache-dir", type=Path, help="where downloaded CSVs are cached")
+    parser.add_argument("--offline", action="store_true", help="use cached downloads only")
+    parser.add_argument(
+        "--insecure", action="store_true", help="skip SSL certificate verification (CERTIFICATE_VERIFY_FAILED)"
+    )
+    parser.add_argument("--snapshot-dir", type=Path, help="where cleaned snapshots are kept")
+    parser.add_argument("--no-snapshots", action="store_true", help="always clean from the CSVs")
+
+
+def _cache(args: argparse.Namespace) -> DownloadCache:
+    return DownloadCache(args.cache_dir, offline=args.offline, verify_ssl=not args.insecure)
+
+
+def _snapshots(args: argparse.Namespace) -> Optional[SnapshotStore]:
+    return None if args.no_snapshots else SnapshotStore(args.snapshot_dir)
+
+
+def _add_profile_options(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", type=Path, metavar="JSON", help="write per-stage timings and memory as JSON")
+    parser.add_argument("--profile-table", action="store_true", help="print per-stage timings and memory")
+    parser.add_argument(
+        "--memory-budget", action="store_true", help="trace peak memory per stage (slower; implies --profile-table)"
+    )
+    parser.add_argument(
+        "--copy-on-write", action="store_true", help="turn on pandas copy-on-write (always on from pandas 3.0)"
+    )
+
+
+def _profiler(args: argparse.Namespace) -> Profiler:
+    if args.memory_budget:
+        args.profile_table = True
+    return Profiler(enabled=bool(args.profile or args.profile_table), trace_memory=args.memory_budget)
+
+
+def _write_profile(profiler: Profiler, args: argparse.Namespace) -> None:
+    if args.profile:
+        profiler.write_json(args.profile)
+    if args.profile_table:
+        print(profiler.table(), file=sys.stderr)
+
+
+def _years(text: str) -> ReportingYears:
+    try:
+        return ReportingYears.parse(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _period(args: argparse.Namespace):
+    return args.years or ReportingPeriod.calendar_year(args.year)
+
+
+def _add_period_options(parser: argparse.ArgumentParser) -> None:
+    years = parser.add_mutually_exclusive_group()
+    years.add_argument("--year", type=int, default=2021, help="calendar reporting year (default: 2021)")
+    years.add_argument(
+        "--years",
+        type=_years,
+        metavar="FIRST-LAST",
+        help="every reporting year in the span, by the year each period ends",
+    )
+
+
+def _refresh(args: argparse.Namespace) -> int:
+    period = _period(args)
+    if args.copy_on_write:
+        enable_copy_on_write()
+    profiler = _profiler(args)
+    result = run_incremental(
+        period, args.state_dir, args.out, cache=_cache(args), snapshots=_snapshots(args), profiler=profiler
+    )
+    kind = "rebuilt" if result.full_rebuild else "refreshed"
+    print(
+        f"State for {period} {kind}: {result.added} new, {result.changed} changed, "
+        f"{result.removed} removed reports; results written to {args.out}"
+    )
+    _write_profile(profiler, args)
+    return 0
+
+
+def _run(args: argparse.Namespace) -> int:
+    if args.years and args.charts:
+        raise SystemExit("--charts cannot be combined with --years")
+    period = _period(args)
+    if args.copy_on_write:
+        enable_copy_on_write()
+    profiler = _profiler(args)
+    run(
+        period,
+        args.out,
+        cache=_cache(args),
+        snapshots=_snapshots(args),
+        charts=args.charts,
+        profiler=profiler,
+        parallel=args.parallel,
+        workers=args.workers,
+    )
+    print(f"Results for {period} written to {args.out}")
+    _write_profile(profiler, args)
+    return 0
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from .service import QueryService, make_server
+
+    period = _period(args)
+    service = QueryService(period, cache=_cache(args), snapshots=_snapshots(args))
+    if args.reload_interval > 0:
+        service.watch(args.reload_interval)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving {period} on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
+        server.server_close()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="irish-charities", description="Financial performance of Irish charities."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="answer Q1-Q12 for a year and write the results")
+    _add_period_options(run_parser)
+    run_parser.add_argument("--out", type=Path, default=Path("results"), help="output directory")
+    run_parser.add_argument("--charts", action="store_true", help="also draw the PNG charts (needs matplotlib, seaborn)")
+    run_parser.add_argument(
+        "--parallel", action="store_true", help="fetch, load and clean both files concurrently in worker processes"
+    )
+    run_parser.add_argument(
+        "--workers", type=int, metavar="N", help="read and clean the reports file in N processes"
+    )
+    _add_source_options(run_parser)
+    _add_profile_options(run_parser)
+    run_parser.set_defaults(handler=_run)
+
+    refresh_parser = commands.add_parser(
+        "refresh", help="update the results with only the reports filed since the last refresh"
+    )
+    refresh_parser.add_argument("--state-dir", type=Path, required=True, help="where the refresh state is kept")
+    _add_period_options(refresh_parser)
+    refresh_parser.add_argument("--out", type=Path, default=Path("results"), help="output directory")
+    _add_source_options(refresh_parser)
+    _add_profile_options(refresh_parser)
+    refresh_parser.set_defaults(handler=_refresh)
+
+    serve_parser = commands.add_parser("serve", help="answer queries over HTTP from the data held in memory")
+    _add_period_options(serve_parser)
+    serve_parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    serve_parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=300.0,
+        metavar="SECONDS",
+        help="how often to check the sources for a new version; 0 disables (default: 300)",
+    )
+    _add_source_options(serve_parser)
+    serve_parser.set_defaults(handler=_serve)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Column names shared by the loading, cleaning and analysis stages."""
+
+# The join key, read as a nullable Int64 in both files.
+CHARITY_NUMBER = "Registered Charity Number"
+CHARITY_NAME = "Registered Charity Name"
+PERIOD_START = "Period Start Date"
+PERIOD_END = "Period End Date"
+# Year in which a report's period ends; added during cleaning.
+REPORTING_YEAR = "Reporting Year"
+
+REGISTER_COLUMNS = [
+    CHARITY_NUMBER,
+    CHARITY_NAME,
+    "Status",
+    "Also Known As",
+    "Primary Address",
+    "Governing Form",
+    "CRO Number",
+    "Country Established",
+    "Charitable Purpose",
+    "Charitable Objects",
+]
+
+# Low-cardinality columns kept as categoricals.
+REGISTER_CATEGORIES = ["Status", "Governing Form", "Country Established"]
+REPORT_CATEGORIES = ["Report Activity"]
+
+# Header names as they appear in charity-annual-reports.csv.
+RAW_REPORT_CHARITY_NUMBER = "Registered\nCharity\nNumber"
+
+REPORT_HEADER_RENAMES = {
+    RAW_REPORT_CHARITY_NUMBER: CHARITY_NUMBER,
+    "Period\nStart Date": PERIOD_START,
+    "Period\nEnd Date": PERIOD_END,
+}
+
+REPORT_TEXT_COLUMNS = [
+    CHARITY_NAME,
+    "Activity Description",
+    "Beneficiaries",
+]
+
+# The eight financial columns used throughout the analysis, mapped to the
+# shorter names they get in the merged frame.
+FINANCIAL_COLUMNS = {
+    "Financial: Income from Central Government or Local Authorities": "Income: Central_Gov Local_Auth",
+    "Financial: Income from other public bodies": "Income: Other Public Bodies",
+    "Financial: Income from philantrophic organisations": "Income: Philantrophic Orgs",
+    "Financial: Income from donations": "Income: Donations",
+    "Financial: Income from trading and commercial activities": "Income: Trading & Commercial",
+    "Financial: Income from other sources": "Income: Other Sources",
+    "Financial: Gross Income": "Total Gross Income",
+    "Financial: Gross Expenditure": "Total Gross Expenditure",
+}
+
+MEASURES = list(FINANCIAL_COLUMNS.values())
+
+# Not part of the notebook's eight measures, but parsed alongside them.
+BEQUESTS = "Financial: Income from bequests"
+
+AMOUNT_COLUMNS = list(FINANCIAL_COLUMNS) + [BEQUESTS]
+
+IRELAND_SYNONYMS = ["Republic of Ireland", "Republic Of Ireland", "Poblacht na hÉireann"]
+
+ENCODING = "ISO-8859-1"
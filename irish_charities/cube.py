@@ -0,0 +1,114 @@
+"""A pre-aggregated cube of the merged frame for the group-by questions.
+
+The cube holds one row per observed combination of reporting year, status,
+lead beneficiary, charity purpose, governing form and country, with the
+number of reports, and the sum and the number of non-missing values of every
+measure. Q8-Q10 and Q12, and any
+other count or sum broken down by those dimensions, are answered by rolling
+the cube up to the requested dimensions, so no row data is scanned again.
+The cube has a few thousand rows however many reports went into it.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .columns import MEASURES, REPORTING_YEAR
+from .merge import CHARITY_PURPOSE, LEAD_BENEFICIARY, NET_INCOME
+from .snapshot import read_arrow, write_arrow
+
+CUBE_DIMENSIONS = [REPORTING_YEAR, "Status", LEAD_BENEFICIARY, CHARITY_PURPOSE, "Governing Form", "Country Established"]
+CUBE_MEASURES = MEASURES + [NET_INCOME]
+COUNT = "count"
+
+
+def count_of(measure: str) -> str:
+    """Name of the cube column counting the non-missing values of ``measure``."""
+    return f"{COUNT}: {measure}"
+
+
+COUNT_COLUMNS = [count_of(measure) for measure in CUBE_MEASURES]
+
+
+class AggregateCube:
+    """Counts and sums of :data:`CUBE_MEASURES` over :data:`CUBE_DIMENSIONS`.
+
+    ``frame`` is indexed by all the dimensions and has a ``count`` column of
+    reports, one sum column per measure and one :func:`count_of` column per
+    measure, which leaves out missing amounts as ``groupby().count()`` does
+    (Q8-Q10 count those). Rows whose dimension is missing keep
+    a missing key, so they count towards every roll-up that does not group
+    by that dimension, as with a ``groupby`` on the row data.
+    """
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+
+    @classmethod
+    def from_frame(cls, file_3: pd.DataFrame) -> "AggregateCube":
+        """Build the cube from the merged frame with its derived columns."""
+        grouped = file_3.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)[CUBE_MEASURES]
+        frame = grouped.sum()
+        frame.insert(0, COUNT, grouped.size())
+        return cls(frame.join(grouped.count().rename(columns=count_of)))
+
+    @classmethod
+    def load(cls, path: os.PathLike) -> "AggregateCube":
+        return cls(read_arrow(path))
+
+    def save(self, path: os.PathLike) -> None:
+        write_arrow(path, self.frame)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def _select(self, where: Optional[Dict[str, Any]]) -> pd.DataFrame:
+        if not where:
+            return self.frame
+        mask = np.ones(len(self.frame), dtype=bool)
+        for dimension, value in where.items():
+            if dimension not in CUBE_DIMENSIONS:
+                raise ValueError(f"Unknown cube dimension {dimension!r}; expected one of {CUBE_DIMENSIONS}")
+            values = value if pd.api.types.is_list_like(value) else [value]
+            mask &= self.frame.index.get_level_values(dimension).isin(values)
+        return self.frame[mask]
+
+    def rollup(self, by: Sequence[str] = (), where: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Return the count and sums grouped by the dimensions in ``by``.
+
+        ``where`` maps dimensions to a value or a list of values to keep
+        before rolling up. Groups with a missing key are dropped, as
+        ``groupby`` does. Without ``by`` a single ``total`` row is returned.
+        """
+        frame = self._select(where)
+        by = list(by)
+        unknown = [dimension for dimension in by if dimension not in CUBE_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unknown cube dimension(s) {unknown}; expected some of {CUBE_DIMENSIONS}")
+        if not by:
+            return frame.sum().to_frame("total").T.astype(dict.fromkeys([COUNT] + COUNT_COLUMNS, "int64"))
+        return frame.groupby(level=by, observed=True).sum()
+
+    def top(
+        self,
+        by: str,
+        value: str = COUNT,
+        n: int = 5,
+        ascending: bool = False,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """Return the ``n`` groups of ``by`` with the largest (or smallest) ``value``.
+
+        ``value`` is ``"count"``, one of the measures or the :func:`count_of`
+        a measure. Ties keep the group order, as ``nlargest`` does.
+        """
+        if value != COUNT and value not in CUBE_MEASURES and value not in COUNT_COLUMNS:
+            raise ValueError(
+                f"Unknown cube value {value!r}; expected 'count', one of {CUBE_MEASURES} or a count_of() them"
+            )
+        rolled = self.rollup([by], where)[[value]]
+        return rolled.nsmallest(n, value) if ascending else rolled.nlargest(n, value)
@@ -0,0 +1,63 @@
+"""Parse the dd/mm/yyyy period dates of the annual-reports file.
+
+Tens of thousands of reports share a few thousand distinct dates, most of
+them 01/01 and 31/12 of some year, and the start and end dates overlap
+heavily. Both columns are stacked and factorised, each distinct string is
+parsed once with the exact format, and the parsed dates are spread back to
+the rows by their codes.
+
+A date that does not match the format or does not exist (e.g. 31/02/2021)
+becomes ``NaT`` with a warning naming the offending strings and how many
+rows carry them; :func:`~irish_charities.clean.clean_annual_reports` then
+drops the reports left without an end date. With ``strict=True`` such a
+date raises a ``ValueError`` instead. Missing and blank cells stay ``NaT``.
+"""
+
+from __future__ import annotations
+
+import warnings
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%d/%m/%Y"
+
+
+def _parse_codes(values: np.ndarray, fmt: str, strict: bool) -> pd.DatetimeIndex:
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Index(uniques, dtype=object), format=fmt, errors="coerce")
+    blank = np.array([not str(value).strip() for value in uniques], dtype=bool)
+    invalid = np.flatnonzero(parsed.isna() & ~blank)
+    if len(invalid):
+        rows = np.bincount(codes[codes >= 0], minlength=len(uniques))[invalid]
+        examples = ", ".join(f"{uniques[i]!r} ({n} rows)" for i, n in zip(invalid[:5], rows[:5]))
+        message = f"{len(invalid)} distinct dates do not match {fmt!r}"
+        if strict:
+            raise ValueError(f"{message}: {examples}")
+        warnings.warn(f"{message} and were set to NaT: {examples}", stacklevel=3)
+    return parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+
+
+def parse_dates(values: pd.Series, fmt: str = DATE_FORMAT, strict: bool = False) -> pd.Series:
+    """Return ``values`` parsed as datetimes, each distinct string once.
+
+    Malformed dates become ``NaT`` with a warning, or raise a ``ValueError``
+    with ``strict``.
+    """
+    parsed = _parse_codes(values.to_numpy(dtype=object), fmt, strict)
+    return pd.Series(parsed, index=values.index, name=values.name)
+
+
+def parse_date_columns(
+    frame: pd.DataFrame, columns: Iterable[str], fmt: str = DATE_FORMAT, strict: bool = False
+) -> None:
+    """Parse ``columns`` of ``frame`` in place, sharing one set of distinct dates.
+
+    Malformed dates are handled as in :func:`parse_dates`.
+    """
+    columns = list(columns)
+    stacked = np.concatenate([frame[column].to_numpy(dtype=object) for column in columns])
+    parsed = _parse_codes(stacked, fmt, strict)
+    for position, column in enumerate(columns):
+        frame[column] = parsed[position * len(frame) : (position + 1) * len(frame)]
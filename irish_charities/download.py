@@ -0,0 +1,182 @@
+"""Local on-disk cache for the Charities Regulator CSV downloads.
+
+Each URL is stored once under the cache directory, next to a small JSON
+sidecar holding the ``ETag`` and ``Last-Modified`` validators returned by the
+server. Later fetches send a conditional request and reuse the cached bytes
+when the server answers ``304 Not Modified``, so the full file only travels
+over the network when the regulator publishes a new version. In offline mode
+the cached copy is used without touching the network at all.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import ssl
+import tempfile
+import time
+import urllib.error
+import urllib.request
+import warnings
+from pathlib import Path
+from typing import Optional
+
+REGISTER_URL = "https://www.charitiesregulator.ie/media/1663/register-of-charities.csv"
+ANNUAL_REPORTS_URL = "https://www.charitiesregulator.ie/media/1664/charity-annual-reports.csv"
+
+DEFAULT_CACHE_DIR = Path(
+    os.environ.get("IRISH_CHARITIES_CACHE", Path.home() / ".cache" / "irish_charities")
+)
+
+_CHUNK_SIZE = 1 << 20
+
+
+class DownloadCache:
+    """Store downloaded files on disk, keyed by URL, and revalidate them.
+
+    Parameters
+    ----------
+    directory:
+        Where cached files live. Defaults to ``$IRISH_CHARITIES_CACHE`` or
+        ``~/.cache/irish_charities``.
+    offline:
+        Never touch the network; serve the cached copy or fail.
+    max_age:
+        Seconds after a successful fetch during which the cached copy is
+        trusted without revalidation. ``None`` revalidates on every fetch.
+    verify_ssl:
+        Set to ``False`` to work around ``CERTIFICATE_VERIFY_FAILED`` errors
+        on machines without an up-to-date certificate store.
+    timeout:
+        Socket timeout for the HTTP request, in seconds.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[os.PathLike] = None,
+        offline: bool = False,
+        max_age: Optional[float] = None,
+        verify_ssl: bool = True,
+        timeout: float = 60.0,
+    ) -> None:
+        self.directory = Path(directory) if directory is not None else DEFAULT_CACHE_DIR
+        self.offline = offline
+        self.max_age = max_age
+        self.verify_ssl = verify_ssl
+        self.timeout = timeout
+
+    def path_for(self, url: str) -> Path:
+        """Return the local path used to cache ``url``."""
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        name = url.rstrip("/").rsplit("/", 1)[-1] or "download"
+        return self.directory / f"{digest}-{name}"
+
+    def metadata(self, url: str) -> dict:
+        """Return the stored validators for ``url`` (empty if not cached)."""
+        meta_path = self._meta_path(url)
+        if not meta_path.exists() or not self.path_for(url).exists():
+            return {}
+        with open(meta_path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def fetch(self, url: str) -> Path:
+        """Return a local path holding the current contents of ``url``.
+
+        The server is asked for the file only if it changed since the cached
+        copy was stored. When the network is unavailable or the server
+        answers with a 5xx error, a cached copy is used with a warning;
+        without one the original error is raised.
+        """
+        path = self.path_for(url)
+        meta = self.metadata(url)
+
+        if self.offline:
+            if not meta:
+                raise FileNotFoundError(f"{url} is not cached in {self.directory} and offline mode is on")
+            return path
+
+        if meta and self.max_age is not None and time.time() - meta.get("checked_at", 0) < self.max_age:
+            return path
+
+        request = urllib.request.Request(url)
+        if meta.get("etag"):
+            request.add_header("If-None-Match", meta["etag"])
+        if meta.get("last_modified"):
+            request.add_header("If-Modified-Since", meta["last_modified"])
+
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout, context=self._ssl_context()) as response:
+                self.directory.mkdir(parents=True, exist_ok=True)
+                meta = self._store(url, response)
+        except urllib.error.HTTPError as exc:
+            if not meta or not (exc.code == 304 or exc.code >= 500):
+                raise
+            if exc.code != 304:
+                warnings.warn(f"Could not revalidate {url} ({exc}); using cached copy from {meta.get('fetched_at')}")
+                return path
+        except (urllib.error.URLError, OSError) as exc:
+            if not meta:
+                raise
+            warnings.warn(f"Could not revalidate {url} ({exc}); using cached copy from {meta.get('fetched_at')}")
+            return path
+
+        meta["checked_at"] = time.time()
+        self._write_meta(url, meta)
+        return path
+
+    def clear(self, url: Optional[str] = None) -> None:
+        """Remove the cached copy of ``url``, or of every URL if omitted."""
+        if url is None:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            return
+        for p in (self.path_for(url), self._meta_path(url)):
+            if p.exists():
+                p.unlink()
+
+    def _meta_path(self, url: str) -> Path:
+        path = self.path_for(url)
+        return path.with_name(path.name + ".json")
+
+    def _ssl_context(self) -> Optional[ssl.SSLContext]:
+        if self.verify_ssl:
+            return None
+        return ssl._create_unverified_context()
+
+    def _store(self, url: str, response) -> dict:
+        path = self.path_for(url)
+        sha = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".partial-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                while True:
+                    block = response.read(_CHUNK_SIZE)
+                    if not block:
+                        break
+                    sha.update(block)
+                    out.write(block)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "sha256": sha.hexdigest(),
+            "size": path.stat().st_size,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+
+    def _write_meta(self, url: str, meta: dict) -> None:
+        meta_path = self._meta_path(url)
+        tmp = meta_path.with_name(meta_path.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2)
+        os.replace(tmp, meta_path)
+
+
+def fetch(url: str, cache: Optional[DownloadCache] = None) -> Path:
+    """Fetch ``url`` through ``cache`` (a default cache if not given)."""
+    return (cache or DownloadCache()).fetch(url)
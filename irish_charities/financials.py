@@ -0,0 +1,235 @@
+"""The financial measures of the merged frame as one compact 2-D block.
+
+The boxplot statistics of the notebook work on the eight financial columns
+and ``Total Net Income``, which pandas keeps as separate float64 arrays (and
+cell 76 copies again into ``financials``). A :class:`FinancialBlock` holds
+them as a single column-major array of shape rows x measures, filled one
+column at a time, so every column is contiguous and column totals, quartiles
+and whisker bounds are each one reduction over ``axis=0``.
+
+:func:`~irish_charities.analyse.analyse` builds the block once; Q1 is its
+``Total Gross Income`` total and the financials boxplot is drawn from its
+:meth:`~FinancialBlock.box_stats`.
+
+Missing amounts are stored as 0 and flagged in a boolean ``missing`` block
+(``None`` when nothing is missing), so totals skip them as ``Series.sum``
+does and the statistics leave them out. Amounts are stored in one of three
+ways:
+
+``"cents"`` (the default)
+    int64 whole cents. The source amounts are whole cents, so this is exact
+    and totals are integer sums, with no float drift however many reports
+    are added up.
+``"float32"``
+    Half the memory, for when euro-level precision is enough.
+    :meth:`FinancialBlock.from_frame` checks every amount survives the
+    rounding within ``tolerance`` euros and raises a ``ValueError``
+    otherwise; float32 keeps about 7 significant digits, so amounts over a
+    few million euros usually need ``"cents"``. Totals are accumulated in
+    float64.
+``"float64"``
+    The same values as the frame, in one block.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .cube import CUBE_MEASURES
+
+CENTS = "cents"
+FLOAT32 = "float32"
+FLOAT64 = "float64"
+
+_STORAGE = {CENTS: (np.int64, 100), FLOAT32: (np.float32, 1), FLOAT64: (np.float64, 1)}
+
+
+class FinancialBlock:
+    """Rows x measures amounts held as one column-major array.
+
+    ``values[:, j]`` holds measure ``columns[j]`` of the rows labelled
+    ``index``, multiplied by ``scale`` (100 for cents, 1 otherwise), with 0
+    where ``missing[:, j]`` is set. ``groups`` optionally labels each row
+    with a group (the reporting year, say) for :meth:`totals`.
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        columns: List[str],
+        index: pd.Index,
+        scale: int = 1,
+        groups: Optional[pd.Series] = None,
+        missing: Optional[np.ndarray] = None,
+    ) -> None:
+        self.values = values
+        self.columns = list(columns)
+        self.index = index
+        self.scale = scale
+        self.groups = groups
+        self.missing = missing
+
+    @classmethod
+    def from_frame(
+        cls,
+        file_3: pd.DataFrame,
+        columns: Optional[List[str]] = None,
+        storage: str = CENTS,
+        by: Optional[str] = None,
+        tolerance: float = 0.5,
+    ) -> "FinancialBlock":
+        """Copy ``columns`` (default :data:`~irish_charities.cube.CUBE_MEASURES`) into a block.
+
+        ``storage`` is ``"cents"``, ``"float32"`` or ``"float64"``; float32
+        needs every amount within ``tolerance`` euros of its stored value
+        (``ValueError`` otherwise). With ``by`` the rows keep that column as
+        their group.
+        """
+        if storage not in _STORAGE:
+            raise ValueError(f"Unknown storage {storage!r}; expected one of {list(_STORAGE)}")
+        dtype, scale = _STORAGE[storage]
+        columns = list(CUBE_MEASURES if columns is None else columns)
+        values = np.empty((len(file_3), len(columns)), dtype=dtype, order="F")
+        missing = None
+        for position, column in enumerate(columns):
+            amounts = file_3[column].to_numpy(dtype=np.float64, na_value=np.nan)
+            absent = ~np.isfinite(amounts)
+            if absent.any():
+                if missing is None:
+                    missing = np.zeros(values.shape, dtype=bool, order="F")
+                missing[:, position] = absent
+                amounts = np.where(absent, 0.0, amounts)
+            if storage == CENTS:
+                np.rint(amounts * scale, out=values[:, position], casting="unsafe")
+            else:
+                values[:, position] = amounts
+                if storage == FLOAT32:
+                    error = np.abs(values[:, position] - amounts).max(initial=0.0)
+                    if error > tolerance:
+                        raise ValueError(
+                            f"{column} loses up to {error:.2f} in float32, more than {tolerance}; use cents"
+                        )
+        return cls(values, columns, file_3.index, scale, file_3[by] if by is not None else None, missing)
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + (self.missing.nbytes if self.missing is not None else 0)
+
+    def _euros(self, values: np.ndarray) -> np.ndarray:
+        return values / self.scale if self.scale != 1 else values.astype(np.float64, copy=False)
+
+    def _present(self, position: int) -> np.ndarray:
+        """The stored values of one measure, without its missing amounts."""
+        values = self.values[:, position]
+        return values if self.missing is None else values[~self.missing[:, position]]
+
+    def column(self, name: str) -> pd.Series:
+        """One measure in euros, as a float64 Series (NaN where missing)."""
+        position = self.columns.index(name)
+        values = self._euros(self.values[:, position])
+        if self.missing is not None and self.missing[:, position].any():
+            values = np.where(self.missing[:, position], np.nan, values)
+        return pd.Series(values, index=self.index, name=name)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Every measure in euros, as float64 columns."""
+        return pd.DataFrame({name: self.column(name) for name in self.columns}, index=self.index)
+
+    def totals(self, grouped: bool = False) -> Union[pd.Series, pd.DataFrame]:
+        """The sum of every measure in euros; per group and measure with ``grouped``.
+
+        Cents are summed as integers, so the totals are exact. Missing
+        amounts are stored as 0 and so are skipped.
+        """
+        accumulate = np.int64 if self.scale != 1 else np.float64
+        if not grouped:
+            return pd.Series(self._euros(self.values.sum(axis=0, dtype=accumulate)), index=self.columns)
+        if self.groups is None:
+            raise ValueError("The block was built without groups; pass by= to from_frame")
+        codes, uniques = pd.factorize(self.groups, sort=True)
+        sums = np.zeros((len(uniques), len(self.columns)), dtype=accumulate)
+        has_group = codes >= 0
+        if has_group.all():
+            np.add.at(sums, codes, self.values)
+        else:
+            np.add.at(sums, codes[has_group], self.values[has_group])
+        return pd.DataFrame(self._euros(sums), index=pd.Index(uniques, name=self.groups.name), columns=self.columns)
+
+    def quantiles(self, q: List[float]) -> pd.DataFrame:
+        """The ``q`` quantiles of every measure in euros, one row per quantile.
+
+        One reduction over ``axis=0``, or one per measure when amounts are
+        missing; a measure with no amounts at all gets NaN.
+        """
+        if self.missing is None and len(self.values):
+            values = np.quantile(self.values, q, axis=0)
+        else:
+            values = np.full((len(q), len(self.columns)), np.nan)
+            for position in range(len(self.columns)):
+                present = self._present(position)
+                if len(present):
+                    values[:, position] = np.quantile(present, q)
+        return pd.DataFrame(values / self.scale, index=pd.Index(q), columns=self.columns)
+
+    def box_stats(self, columns: Optional[List[str]] = None, whis: float = 1.5) -> List[Dict[str, object]]:
+        """Boxplot statistics of ``columns`` (default all), as :meth:`matplotlib.axes.Axes.bxp` takes them.
+
+        The quartiles, means and whiskers (the furthest values within
+        ``whis`` IQRs of the box) of every measure are each one reduction
+        over ``axis=0``; the whiskers are a masked min and max rather than a
+        copy of the values inside the fences. Missing amounts are left out.
+        """
+        q1, med, q3 = self.quantiles([0.25, 0.5, 0.75]).to_numpy() * self.scale
+        iqr = q3 - q1
+        low, high = q1 - whis * iqr, q3 + whis * iqr
+        above_low = self.values >= low
+        below_high = self.values <= high
+        if self.missing is not None:
+            above_low &= ~self.missing
+            below_high &= ~self.missing
+        if self.values.dtype.kind == "i":
+            largest, smallest = np.iinfo(self.values.dtype).max, np.iinfo(self.values.dtype).min
+        else:
+            largest, smallest = np.inf, -np.inf
+        whislo = np.min(self.values, axis=0, where=above_low, initial=largest)
+        whishi = np.max(self.values, axis=0, where=below_high, initial=smallest)
+        # An empty whisker range collapses onto the box, as matplotlib does.
+        whislo = np.where(above_low.any(axis=0), np.minimum(whislo, q1), q1)
+        whishi = np.where(below_high.any(axis=0), np.maximum(whishi, q3), q3)
+        counts = len(self.values) - (self.missing.sum(axis=0) if self.missing is not None else 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.values.sum(axis=0, dtype=np.float64) / counts
+
+        stats = []
+        for label in self.columns if columns is None else columns:
+            j = self.columns.index(label)
+            present = self._present(j)
+            stats.append(
+                {
+                    "label": label,
+                    "mean": means[j] / self.scale,
+                    "med": med[j] / self.scale,
+                    "q1": q1[j] / self.scale,
+                    "q3": q3[j] / self.scale,
+                    "iqr": iqr[j] / self.scale,
+                    "whislo": whislo[j] / self.scale,
+                    "whishi": whishi[j] / self.scale,
+                    "fliers": self._euros(present[(present < low[j]) | (present > high[j])]),
+                }
+            )
+        return stats
+
+
+def to_cents(values: pd.Series) -> np.ndarray:
+    """Euro amounts as int64 whole cents; missing amounts become 0."""
+    amounts = values.to_numpy(dtype=np.float64, na_value=np.nan)
+    cents = np.zeros(len(amounts), dtype=np.int64)
+    np.rint(amounts * 100, out=cents, where=~np.isnan(amounts), casting="unsafe")
+    return cents
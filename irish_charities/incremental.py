@@ -0,0 +1,339 @@
+"""Incremental refresh: clean and merge only newly filed or changed reports.
+
+A state directory keeps, from the previous run:
+
+* ``watermark.arrow``: one row per annual report, indexed by a 64-bit key
+  hashed from the charity number, the raw period dates and an occurrence
+  counter, holding a hash of the report's raw row;
+* ``reports.arrow`` and ``file_3.arrow``: the cleaned reports and the merged
+  frame, both indexed by the same key;
+* ``aggregates_<name>.arrow``: counts and sums of every measure per
+  reporting year, overall and per country, governing form and lead
+  beneficiary, the sums in int64 cents so that adding and removing deltas
+  never drifts;
+* ``state.json``: the register version, the period and the cleaning version
+  the state was built with, its generation, and the byte offset up to which
+  the reports file was parsed with the SHA-256 of the bytes before it.
+
+Every refresh writes its files under a new generation (``file_3-3.arrow``,
+say) and only then replaces ``state.json`` to point at them, atomically, so
+a refresh interrupted part-way leaves the previous generation in force;
+files of other generations are removed afterwards.
+
+The regulator's file mostly grows at the end. When the bytes up to the
+stored offset are unchanged, only the rows appended after it are parsed, and
+they are all new reports. Otherwise the whole file is read as text (with the
+period filter pushed down as usual) and only rows whose key is new or whose
+row hash changed are cleaned and merged. ``file_3`` and the aggregates are
+then updated by removing the old version of those rows and adding the new
+one. Reports that disappeared from the file are removed the same way.
+
+A new register version re-joins the stored cleaned reports and recomputes
+the aggregates (no report is cleaned again). A different period or cleaning
+version starts from an empty state.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import BinaryIO, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .clean import clean_annual_reports
+from .columns import MEASURES, REPORTING_YEAR
+from .financials import to_cents
+from .load import iter_annual_reports, read_annual_reports
+from .merge import LEAD_BENEFICIARY, NET_INCOME, add_derived_columns, concat_frames, merge
+from .parallel import byte_ranges
+from .period import ReportingPeriod, ReportingYears
+from .snapshot import CLEANING_VERSION, read_arrow, write_arrow
+
+AGGREGATE_DIMENSIONS: Dict[str, List[str]] = {
+    "total": [],
+    "country": ["Country Established"],
+    "governing_form": ["Governing Form"],
+    "lead_beneficiary": [LEAD_BENEFICIARY],
+}
+AGGREGATE_MEASURES = MEASURES + [NET_INCOME]
+STATE_FILES = ["watermark", "reports", "file_3"] + [f"aggregates_{name}" for name in AGGREGATE_DIMENSIONS]
+
+# Bump whenever the keys or the layout of the state files change.
+STATE_VERSION = 2
+
+_HASH_BLOCK = 1 << 20
+
+
+class RefreshResult(NamedTuple):
+    added: int
+    changed: int
+    removed: int
+    full_rebuild: bool
+    file_3: pd.DataFrame
+    aggregates: Dict[str, pd.DataFrame]
+    appended_only: bool = False
+
+
+def _id_hashes(raw_2: pd.DataFrame) -> np.ndarray:
+    return pd.util.hash_pandas_object(raw_2.iloc[:, [0, 2, 3]], index=False).to_numpy()
+
+
+def _keys(ids: np.ndarray, seen: Optional[pd.Series] = None) -> np.ndarray:
+    occurrence = pd.Series(ids).groupby(ids, sort=False).cumcount().to_numpy()
+    if seen is not None:
+        occurrence = occurrence + seen.reindex(ids, fill_value=0).to_numpy()
+    return pd.util.hash_pandas_object(pd.DataFrame({"id": ids, "occurrence": occurrence}), index=False).to_numpy()
+
+
+def report_keys(raw_2: pd.DataFrame, seen: Optional[pd.Series] = None) -> np.ndarray:
+    """Return a 64-bit key per raw report row.
+
+    The key hashes the charity number and the raw start and end dates, plus
+    a counter so that a charity filing twice for the same period still gets
+    two distinct keys. For rows appended to a file already keyed, ``seen``
+    counts the earlier rows per hash of those three columns, so the counters
+    carry on where they stopped and the keys equal those of a full parse.
+    """
+    return _keys(_id_hashes(raw_2), seen)
+
+
+def aggregate(file_3: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Count the reports and sum every measure per reporting year and dimension.
+
+    The sums are int64 cents, with missing amounts skipped; see
+    :func:`in_euros`.
+    """
+    cents = pd.DataFrame({measure: to_cents(file_3[measure]) for measure in AGGREGATE_MEASURES}, index=file_3.index)
+    aggregates = {}
+    for name, dimensions in AGGREGATE_DIMENSIONS.items():
+        keys = [file_3[REPORTING_YEAR]] + [file_3[d].astype(object).fillna("") for d in dimensions]
+        grouped = cents.groupby(keys)
+        frame = grouped.sum()
+        frame.insert(0, "count", grouped.size())
+        aggregates[name] = frame
+    return aggregates
+
+
+def in_euros(aggregates: pd.DataFrame) -> pd.DataFrame:
+    """Convert the cent sums of an :func:`aggregate` frame to euros."""
+    return aggregates.assign(**{measure: aggregates[measure] / 100 for measure in AGGREGATE_MEASURES})
+
+
+def _apply_delta(
+    aggregates: Dict[str, pd.DataFrame], added: pd.DataFrame, removed: pd.DataFrame
+) -> Dict[str, pd.DataFrame]:
+    plus, minus = aggregate(added), aggregate(removed)
+    updated = {}
+    for name, frame in aggregates.items():
+        # Aligning on the union first keeps every column int64.
+        index = frame.index.union(plus[name].index).union(minus[name].index)
+        frame = (
+            frame.reindex(index, fill_value=0)
+            + plus[name].reindex(index, fill_value=0)
+            - minus[name].reindex(index, fill_value=0)
+        )
+        updated[name] = frame[frame["count"] > 0].sort_index()
+    return updated
+
+
+def _hash_into(sha, fh: BinaryIO, length: int) -> None:
+    while length > 0:
+        block = fh.read(min(_HASH_BLOCK, length))
+        if not block:
+            break
+        sha.update(block)
+        length -= len(block)
+
+
+def _scan_reports(path: os.PathLike, source: Optional[dict]) -> Tuple[Optional[bytes], dict]:
+    """Hash the reports file and return the bytes appended since ``source``.
+
+    ``source`` holds the ``offset`` up to which the file was last parsed and
+    the ``sha256`` of the bytes before it. If the file still starts with
+    those bytes, the bytes after them are returned (possibly none);
+    otherwise ``None``, and the whole file has to be parsed again. The
+    offset and hash of the file as it is now are returned for next time; the
+    offset is only kept when the file ends with a complete row, so that it
+    always falls on a row boundary.
+    """
+    sha = hashlib.sha256()
+    appended = None
+    with open(path, "rb") as fh:
+        size = fh.seek(0, io.SEEK_END)
+        fh.seek(0)
+        offset = (source or {}).get("offset")
+        if offset is not None and offset <= size:
+            _hash_into(sha, fh, offset)
+            if sha.hexdigest() == source["sha256"]:
+                appended = fh.read()
+                sha.update(appended)
+        if appended is None:
+            sha = hashlib.sha256()
+            fh.seek(0)
+            _hash_into(sha, fh, size)
+        fh.seek(max(size - 1, 0))
+        complete = fh.read(1) in (b"", b"\n")
+    return appended, {"offset": size if complete else None, "sha256": sha.hexdigest()}
+
+
+def _read_appended(path: os.PathLike, appended: bytes, period) -> pd.DataFrame:
+    """Parse rows appended to the reports file as :func:`read_annual_reports` would."""
+    header, _ = byte_ranges(path, 1)
+    return pd.concat(list(iter_annual_reports(io.BytesIO(header + appended), period)))
+
+
+class IncrementalState:
+    """The state directory of an incremental refresh for one period."""
+
+    def __init__(self, directory: os.PathLike, period: Union[ReportingPeriod, ReportingYears]) -> None:
+        self.directory = Path(directory)
+        self.period = period
+
+    def _path(self, name: str, generation: int) -> Path:
+        return self.directory / f"{name}-{generation}.arrow"
+
+    def _read_meta(self) -> dict:
+        path = self.directory / "state.json"
+        if not path.exists():
+            return {}
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+
+    def _write_meta(self, meta: dict) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".partial-", suffix=".json")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(meta, fh, indent=2)
+            os.replace(tmp_name, self.directory / "state.json")
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def _remove_other_generations(self, generation: int) -> None:
+        current = {self._path(name, generation) for name in STATE_FILES}
+        for name in STATE_FILES:
+            for path in self.directory.glob(f"{name}*.arrow"):
+                if path not in current:
+                    path.unlink()
+
+    def _is_compatible(self, meta: dict) -> bool:
+        return (
+            meta.get("state_version") == STATE_VERSION
+            and meta.get("period") == str(self.period)
+            and meta.get("cleaning_version") == CLEANING_VERSION
+            and "generation" in meta
+            and all(self._path(name, meta["generation"]).exists() for name in STATE_FILES)
+        )
+
+    def refresh(self, file_1: pd.DataFrame, register_version: str, reports_path: os.PathLike) -> RefreshResult:
+        """Bring the state up to date with the reports file and the register."""
+        meta = self._read_meta()
+        full_rebuild = not self._is_compatible(meta)
+        if full_rebuild:
+            watermark = pd.DataFrame(
+                {"row_hash": pd.Series(dtype="uint64"), "id_hash": pd.Series(dtype="uint64")},
+                index=pd.Index([], dtype="uint64"),
+            )
+            reports = file_3 = None
+            aggregates = None
+        else:
+            generation = meta["generation"]
+            watermark = read_arrow(self._path("watermark", generation))
+            reports = read_arrow(self._path("reports", generation))
+            file_3 = read_arrow(self._path("file_3", generation))
+            aggregates = {
+                name: read_arrow(self._path(f"aggregates_{name}", generation)) for name in AGGREGATE_DIMENSIONS
+            }
+
+        appended, source = _scan_reports(reports_path, None if full_rebuild else meta.get("source"))
+        if appended is None:
+            raw_2 = read_annual_reports(reports_path, period=self.period)
+            seen = None
+        else:
+            raw_2 = _read_appended(reports_path, appended, self.period)
+            seen = watermark["id_hash"].value_counts()
+        ids = _id_hashes(raw_2)
+        raw_2.index = pd.Index(_keys(ids, seen), dtype="uint64")
+        marks = pd.DataFrame({"row_hash": pd.util.hash_pandas_object(raw_2, index=False), "id_hash": ids})
+
+        if appended is None:
+            known = marks.index.isin(watermark.index)
+            stored_hashes = watermark["row_hash"].reindex(marks.index[known])
+            changed_keys = marks.index[known][stored_hashes.to_numpy() != marks["row_hash"][known].to_numpy()]
+            added_keys = marks.index[~known]
+            removed_keys = watermark.index[~watermark.index.isin(marks.index)]
+        else:
+            # The earlier rows are unchanged, so every parsed row is a new report.
+            added_keys = marks.index
+            changed_keys = removed_keys = marks.index[:0]
+            marks = pd.concat([watermark, marks])
+
+        delta_reports = clean_annual_reports(raw_2.loc[added_keys.append(changed_keys)], inplace=True)
+        stale_keys = changed_keys.append(removed_keys)
+        delta_file_3 = add_derived_columns(merge(file_1, delta_reports, keep_index=True))
+
+        if full_rebuild:
+            reports, file_3 = delta_reports, delta_file_3
+            aggregates = aggregate(file_3)
+        else:
+            # Reports dropped by the cleaning (no valid end date) are in the
+            # watermark but not in the cleaned frames.
+            reports = concat_frames([reports.drop(index=stale_keys, errors="ignore"), delta_reports])
+            if meta.get("register_version") != register_version:
+                file_3 = add_derived_columns(merge(file_1, reports, keep_index=True))
+                aggregates = aggregate(file_3)
+            else:
+                stale_rows = file_3.loc[file_3.index.intersection(stale_keys)]
+                file_3 = concat_frames([file_3.drop(index=stale_rows.index), delta_file_3])
+                aggregates = _apply_delta(aggregates, delta_file_3, stale_rows)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        generation = meta.get("generation", 0) + 1
+        write_arrow(self._path("watermark", generation), marks)
+        write_arrow(self._path("reports", generation), reports)
+        write_arrow(self._path("file_3", generation), file_3)
+        for name, frame in aggregates.items():
+            write_arrow(self._path(f"aggregates_{name}", generation), frame)
+        # The new generation only takes over once every file of it is written.
+        self._write_meta(
+            {
+                "state_version": STATE_VERSION,
+                "period": str(self.period),
+                "cleaning_version": CLEANING_VERSION,
+                "register_version": register_version,
+                "generation": generation,
+                "refreshed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "reports": len(file_3),
+                "source": source,
+            }
+        )
+        self._remove_other_generations(generation)
+
+        return RefreshResult(
+            added=len(added_keys),
+            changed=len(changed_keys),
+            removed=len(removed_keys),
+            full_rebuild=full_rebuild,
+            file_3=file_3,
+            aggregates={name: in_euros(frame) for name, frame in aggregates.items()},
+            appended_only=appended is not None,
+        )
+
+
+def refresh(
+    state_dir: os.PathLike,
+    period: Union[ReportingPeriod, ReportingYears],
+    file_1: pd.DataFrame,
+    register_version: str,
+    reports_path: os.PathLike,
+) -> RefreshResult:
+    """Shorthand for ``IncrementalState(state_dir, period).refresh(...)``."""
+    return IncrementalState(state_dir, period).refresh(file_1, register_version, reports_path)
+
@@ -0,0 +1,121 @@
+"""Read the two Charities Regulator CSV files into raw DataFrames.
+
+Both files start with an "Effective Date" banner row above the real header
+and end with empty trailing columns; the readers skip both, as the notebook
+does with ``skiprows=[0]`` and ``usecols``.
+
+The annual-reports file covers every period since 2014. When a reporting
+period is given it is applied chunk by chunk on the raw date strings, so the
+cleaning that follows only ever sees the rows being kept.
+
+The register is also padded to about a million lines with rows made of
+nothing but commas. Those are cut off before parsing, so the frame only ever
+holds the ~14k real charities.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+from collections import defaultdict
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from .columns import (
+    CHARITY_NUMBER,
+    ENCODING,
+    RAW_REPORT_CHARITY_NUMBER,
+    REGISTER_CATEGORIES,
+    REPORT_CATEGORIES,
+)
+from .period import ReportingPeriod
+
+_PADDING = b", \t\r\n"
+_SCAN_BLOCK = 1 << 20
+
+DEFAULT_CHUNKSIZE = 20_000
+
+
+def _data_end(fh) -> int:
+    """Return the offset just past the last row that is not padding.
+
+    A padding row holds nothing but commas and whitespace. The file is
+    scanned backwards in blocks, so the trailing padding is read once but
+    never parsed; the last real row is kept whole, including any trailing
+    spaces or empty fields of its own.
+    """
+    end = fh.seek(0, io.SEEK_END)
+    while end > 0:
+        start = max(0, end - _SCAN_BLOCK)
+        fh.seek(start)
+        block = fh.read(end - start).rstrip(_PADDING)
+        if block:
+            # Everything after the last content byte is padding, so the
+            # next newline ends the last real row.
+            fh.seek(start + len(block))
+            return start + len(block) + len(fh.readline())
+        end = start
+    return 0
+
+
+def read_register(path: os.PathLike) -> pd.DataFrame:
+    """Read register-of-charities.csv (File 1) without any cleaning.
+
+    Trailing all-empty padding rows are skipped at parse time.
+    """
+    with open(path, "rb") as fh:
+        end = _data_end(fh)
+        fh.seek(0)
+        data = io.BytesIO(fh.read(end))
+    return pd.read_csv(
+        data,
+        encoding=ENCODING,
+        skiprows=[0],
+        usecols=range(0, 10),
+        dtype={CHARITY_NUMBER: "Int64", **dict.fromkeys(REGISTER_CATEGORIES, "category")},
+        low_memory=False,
+    )
+
+
+def read_annual_reports(
+    path: os.PathLike,
+    period: Optional[ReportingPeriod] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> pd.DataFrame:
+    """Read charity-annual-reports.csv (File 2) without any cleaning.
+
+    With ``period`` the file is streamed in chunks of ``chunksize`` rows and
+    only reports covering exactly that period are kept. Every column other
+    than the charity number is then read as text; the row index still counts
+    rows across the whole file.
+    """
+    if period is None:
+        return pd.read_csv(
+            path,
+            encoding=ENCODING,
+            skiprows=[0],
+            usecols=range(0, 16),
+            dtype={RAW_REPORT_CHARITY_NUMBER: "Int64", **dict.fromkeys(REPORT_CATEGORIES, "category")},
+            low_memory=False,
+        )
+
+    return pd.concat(list(iter_annual_reports(path, period, chunksize)))
+
+
+def iter_annual_reports(
+    path: os.PathLike,
+    period: Optional[ReportingPeriod] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Iterator[pd.DataFrame]:
+    """Yield charity-annual-reports.csv in raw chunks of ``chunksize`` rows.
+
+    Every column other than the charity number is read as text. With
+    ``period`` each chunk only keeps the reports covering that period.
+    """
+    dtype = defaultdict(lambda: str, {RAW_REPORT_CHARITY_NUMBER: "Int64"})
+    with pd.read_csv(
+        path, encoding=ENCODING, skiprows=[0], usecols=range(0, 16), dtype=dtype, chunksize=chunksize
+    ) as reader:
+        for chunk in reader:
+            yield chunk if period is None else chunk[period.raw_mask(chunk.iloc[:, 2], chunk.iloc[:, 3])]
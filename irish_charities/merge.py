@@ -0,0 +1,80 @@
+"""Join the cleaned register (File 1) onto the annual reports (File 2)."""
+
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .columns import CHARITY_NAME, CHARITY_NUMBER, FINANCIAL_COLUMNS
+
+NET_INCOME = "Total Net Income"
+LEAD_BENEFICIARY = "Lead Beneficiary"
+CHARITY_PURPOSE = "Charity Purpose"
+
+
+def merge(file_1: pd.DataFrame, file_2: pd.DataFrame, keep_index: bool = False) -> pd.DataFrame:
+    """Return ``file_3``: every report with its charity's register details.
+
+    Every report is kept, including those whose charity is missing from the
+    register. The register is indexed by its integer charity number, which
+    must be unique. ``Registered Charity Name`` is taken from the register
+    and the financial columns get their short names. The result has a fresh
+    range index unless ``keep_index`` asks for File 2's index.
+    """
+    register = file_1.set_index(CHARITY_NUMBER)
+    if not register.index.is_unique:
+        duplicated = register.index[register.index.duplicated()].unique()
+        raise ValueError(f"Registered Charity Number is not unique in the register: {duplicated[:5].tolist()}")
+    # Only the register columns are copied, into report order; the report
+    # columns are shared with file_2 (copy-on-write keeps them safe).
+    details = register.reindex(pd.Index(file_2[CHARITY_NUMBER])).set_axis(file_2.index)
+    reports = [column for column in file_2.columns if column not in (CHARITY_NUMBER, CHARITY_NAME)]
+    file_3 = pd.concat([file_2[[CHARITY_NUMBER]], details, file_2[reports]], axis=1)
+    file_3 = file_3.rename(columns=FINANCIAL_COLUMNS)
+    return file_3 if keep_index else file_3.reset_index(drop=True)
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames, keeping categorical columns categorical.
+
+    Frames cleaned separately (e.g. chunk by chunk) have different categories
+    for the same column; they are unioned first so ``pd.concat`` does not fall
+    back to object columns.
+    """
+    frames = [frame for frame in frames if len(frame)] or frames[:1]
+    for column in frames[0].columns:
+        if not all(isinstance(frame[column].dtype, pd.CategoricalDtype) for frame in frames):
+            continue
+        categories = frames[0][column].cat.categories
+        for frame in frames[1:]:
+            categories = categories.union(frame[column].cat.categories)
+        frames = [frame.assign(**{column: frame[column].cat.set_categories(categories)}) for frame in frames]
+    return pd.concat(frames)
+
+
+def first_item(values: pd.Series) -> pd.Series:
+    """Return the first entry of each semicolon-separated list, as a categorical.
+
+    Each distinct list is split once, rather than once per row.
+    """
+    codes, uniques = pd.factorize(values)
+    firsts = pd.Index(uniques).str.split(";").str[0]
+    categories = pd.Index(firsts.unique()).dropna().sort_values()
+    first_codes = np.append(categories.get_indexer(firsts), -1)
+    return pd.Series(
+        pd.Categorical.from_codes(first_codes[codes], categories), index=values.index, name=values.name
+    )
+
+
+def add_derived_columns(file_3: pd.DataFrame) -> pd.DataFrame:
+    """Add ``Total Net Income``, ``Lead Beneficiary`` and ``Charity Purpose``.
+
+    The last two are the first entry of the semicolon-separated
+    ``Beneficiaries`` and ``Charitable Purpose`` lists, kept as categoricals.
+    """
+    file_3[NET_INCOME] = file_3["Total Gross Income"] - file_3["Total Gross Expenditure"]
+    file_3[LEAD_BENEFICIARY] = first_item(file_3["Beneficiaries"])
+    file_3[CHARITY_PURPOSE] = first_item(file_3["Charitable Purpose"])
+    return file_3
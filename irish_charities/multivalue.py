@@ -0,0 +1,167 @@
+"""Semicolon-separated multi-valued fields as a sparse incidence matrix.
+
+``Beneficiaries`` and ``Charitable Purpose`` list several values per row,
+e.g. ``"Children; Older people; Carers"``. The notebook keeps only the first
+one. :class:`MultiValued` keeps them all as a rows x categories 0/1 matrix in
+compressed sparse row form: an ``indptr`` array of row offsets and an
+``indices`` array of integer category codes. Each distinct list is split
+once, however many rows repeat it.
+
+Amounts are attributed to every listed category with a sparse matrix-vector
+product, done with ``np.bincount`` over the stored entries; with
+``split=True`` each row's amount is shared equally between its categories,
+so the attributed totals add up to the total amount.
+"""
+
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SEPARATOR = ";"
+
+
+class MultiValued:
+    """A rows x categories incidence matrix of a multi-valued column.
+
+    Build it with :meth:`from_series`. Row ``i`` lists the category codes
+    ``indices[indptr[i]:indptr[i + 1]]``, in the order they first appear in
+    the cell; ``categories`` is sorted. A missing or empty cell has no
+    entries.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, categories: pd.Index, name: Optional[str] = None):
+        self.indptr = indptr
+        self.indices = indices
+        self.categories = categories
+        self.name = name
+
+    @classmethod
+    def from_series(cls, values: pd.Series, sep: str = SEPARATOR) -> "MultiValued":
+        """Tokenise every distinct list of ``values`` once and code the tokens."""
+        codes, uniques = pd.factorize(values)
+        tokens = [
+            list(dict.fromkeys(item for item in (part.strip() for part in str(value).split(sep)) if item))
+            for value in uniques
+        ]
+        categories = pd.Index(sorted({item for items in tokens for item in items}), dtype=object)
+        lookup = {item: code for code, item in enumerate(categories)}
+        unique_lengths = np.array([len(items) for items in tokens] + [0], dtype=np.int64)
+        unique_indptr = np.concatenate([[0], np.cumsum(unique_lengths)])
+        unique_indices = np.array([lookup[item] for items in tokens for item in items], dtype=np.int32)
+
+        # Rows with a missing value have code -1, i.e. the trailing empty list.
+        lengths = unique_lengths[codes]
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        offsets = np.repeat(unique_indptr[codes] - indptr[:-1], lengths)
+        indices = unique_indices[offsets + np.arange(indptr[-1])]
+        return cls(indptr, indices, categories, values.name)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return len(self.indptr) - 1, len(self.categories)
+
+    def first(self) -> pd.Series:
+        """The first category listed in each row, as a categorical (missing if none).
+
+        This is the "Lead Beneficiary" or "Charity Purpose" of the notebook,
+        which Q8 and Q9 group by.
+        """
+        lengths = self.lengths()
+        codes = np.full(self.shape[0], -1, dtype=np.int64)
+        codes[lengths > 0] = self.indices[self.indptr[:-1][lengths > 0]]
+        return pd.Series(pd.Categorical.from_codes(codes, self.categories), name=self.name)
+
+    def lengths(self) -> np.ndarray:
+        """Number of categories listed in each row."""
+        return np.diff(self.indptr)
+
+    def rows(self) -> np.ndarray:
+        """The row position of every stored entry."""
+        return np.repeat(np.arange(self.shape[0]), self.lengths())
+
+    def weights(self, split: bool = False) -> np.ndarray:
+        """The matrix entry of every stored entry: 1, or 1/k with ``split``."""
+        if not split:
+            return np.ones(len(self.indices))
+        return np.repeat(1.0 / np.maximum(self.lengths(), 1), self.lengths())
+
+    def counts(self) -> pd.Series:
+        """How many rows list each category."""
+        return pd.Series(
+            np.bincount(self.indices, minlength=len(self.categories)), index=self.categories, name="count"
+        ).rename_axis(self.name)
+
+    def dot(self, amounts: pd.Series, split: bool = False, by: Optional[pd.Series] = None) -> pd.Series:
+        """Attribute ``amounts`` (one per row) to every category the row lists.
+
+        With ``split`` each row's amount is divided equally between its
+        categories. With ``by`` (one key per row, e.g. the reporting year)
+        the totals are broken down by that key first; categories a group
+        never lists are left out.
+        """
+        values = amounts.to_numpy(dtype="float64", na_value=0.0)
+        if len(values) != self.shape[0]:
+            raise ValueError(f"Expected {self.shape[0]} amounts, got {len(values)}")
+        entry_values = np.repeat(values, self.lengths()) * self.weights(split)
+        if by is None:
+            totals = np.bincount(self.indices, weights=entry_values, minlength=len(self.categories))
+            return pd.Series(totals, index=self.categories, name=amounts.name).rename_axis(self.name)
+
+        group_codes, groups = pd.factorize(by, sort=True)
+        entry_groups = np.repeat(group_codes, self.lengths())
+        keep = entry_groups >= 0
+        cells = entry_groups[keep] * len(self.categories) + self.indices[keep]
+        size = len(groups) * len(self.categories)
+        totals = np.bincount(cells, weights=entry_values[keep], minlength=size)
+        listed = np.bincount(cells, minlength=size) > 0
+        index = pd.MultiIndex.from_product([groups, self.categories], names=[by.name, self.name])
+        return pd.Series(totals[listed], index=index[listed], name=amounts.name)
+
+    def explode(self, index: Optional[pd.Index] = None) -> pd.Series:
+        """Return one categorical entry per (row, category) pair.
+
+        The result is indexed by ``index`` (default: row positions), repeated
+        once per category of the row.
+        """
+        rows = self.rows()
+        labels = rows if index is None else index[rows]
+        return pd.Series(pd.Categorical.from_codes(self.indices, self.categories), index=labels, name=self.name)
+
+    def to_scipy(self):
+        """Return the matrix as a ``scipy.sparse.csr_matrix`` (needs scipy)."""
+        from scipy import sparse
+
+        return sparse.csr_matrix((np.ones(len(self.indices)), self.indices, self.indptr), shape=self.shape)
+
+
+def funds_by_category(
+    file_3: pd.DataFrame,
+    column: str,
+    measure: str = "Total Gross Expenditure",
+    split: bool = False,
+    by: Optional[str] = None,
+    matrix: Optional[MultiValued] = None,
+) -> pd.DataFrame:
+    """Count and sum ``measure`` over every category listed in ``column``.
+
+    Unlike the lead beneficiary and purpose parts of Q8 and Q9, which only
+    look at the first entry of the list, every listed beneficiary or purpose
+    is credited. With ``split`` the amounts are shared equally, so they add
+    up to the column total; otherwise each category gets the full amount of
+    every row listing it. ``count`` is the number of rows listing the
+    category with ``measure`` present, as ``groupby().count()`` counts.
+    ``by`` names a column (e.g. ``Reporting Year``) to break the result down
+    by. ``matrix`` is ``MultiValued.from_series(file_3[column])``, if it was
+    already built.
+    """
+    matrix = MultiValued.from_series(file_3[column]) if matrix is None else matrix
+    present = file_3[measure].notna().astype("float64")
+    keys = None if by is None else file_3[by]
+    count = matrix.dot(present, by=keys)
+    frame = pd.DataFrame(
+        {"count": count.astype("int64"), measure: matrix.dot(file_3[measure], split=split, by=keys)}
+    ).sort_values(measure, ascending=False, kind="stable")
+    return frame if by is None else frame.sort_index(level=0, sort_remaining=False, kind="stable")
@@ -0,0 +1,100 @@
+"""Q1-Q12 for every reporting year at once.
+
+The annual reports are cleaned and merged once for the whole span of years
+and each question is answered with a single grouped pass over the reporting
+year, instead of re-running the single-period pipeline per year. Every
+answer is indexed by year first: scalars become a Series per year, and the
+"Top 5" tables hold the top five of each year. Those are ranked per year in
+one pass by :func:`~irish_charities.topn.top_n`, and the group-by questions
+are rolled up from the :class:`~irish_charities.cube.AggregateCube`, which
+keeps the reporting year as one of its dimensions. Q1 is the per-year total
+of a :class:`~irish_charities.financials.FinancialBlock` grouped by year.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from .analyse import QUESTIONS, RANKINGS, SUMMARY_COLUMNS, TOP_N, Rankings, all_listed
+from .columns import REPORTING_YEAR
+from .cube import CUBE_MEASURES, AggregateCube, count_of
+from .financials import FinancialBlock
+from .merge import CHARITY_PURPOSE, LEAD_BENEFICIARY
+from .outliers import iqr_fences, outlier_sets
+from .profiling import Profiler
+from .topn import top_n
+
+
+# The rankings of the "Top 5" questions, made within each reporting year.
+RANKINGS_BY_YEAR = {key: ranking._replace(by=REPORTING_YEAR) for key, ranking in RANKINGS.items()}
+
+
+def _top_by_year(rankings: Rankings, key: str) -> pd.DataFrame:
+    return rankings[RANKINGS_BY_YEAR[key]].set_index(REPORTING_YEAR)[SUMMARY_COLUMNS]
+
+
+def _top_groups_by_year(cube: AggregateCube, by: str) -> Dict[str, pd.DataFrame]:
+    grouped = cube.rollup([REPORTING_YEAR, by])
+    parts = {}
+    for part, column in [("count", count_of("Total Gross Expenditure")), ("amount", "Total Gross Expenditure")]:
+        ranked = grouped[[column]].sort_values([column], ascending=False, kind="stable")
+        ranked = ranked.groupby(level=REPORTING_YEAR, sort=False).head(TOP_N)
+        ranked = ranked.sort_index(level=0, sort_remaining=False, kind="stable")
+        parts[part] = ranked.rename(columns={column: "Total Gross Expenditure"})
+    return parts
+
+
+def _outliers_by_year(file_3: pd.DataFrame) -> Dict[str, Any]:
+    columns = ["Total Gross Income"]
+    fences = iqr_fences(file_3, columns, by=REPORTING_YEAR)
+    outliers = file_3.loc[outlier_sets(file_3, columns, by=REPORTING_YEAR, fences=fences)["Total Gross Income"]]
+    outliers = outliers.set_index(REPORTING_YEAR)[SUMMARY_COLUMNS].sort_index(kind="stable")
+    return {"limits": fences.xs("Total Gross Income", level="measure"), "outliers": outliers}
+
+
+ANSWERS_BY_YEAR = {
+    "q01": lambda b: b.totals(grouped=True)["Total Gross Income"],
+    "q02": lambda r: _top_by_year(r, "q02"),
+    "q03": lambda r: _top_by_year(r, "q03"),
+    "q04": lambda r: _top_by_year(r, "q04"),
+    "q05": lambda r: _top_by_year(r, "q05"),
+    "q06": lambda f: (f["Total Gross Income"] == 0).groupby(f[REPORTING_YEAR]).sum(),
+    "q07": lambda r: _top_by_year(r, "q07"),
+    "q08": lambda c, f: {
+        **_top_groups_by_year(c, LEAD_BENEFICIARY),
+        **all_listed(f, "Beneficiaries", by=REPORTING_YEAR),
+    },
+    "q09": lambda c, f: {
+        **_top_groups_by_year(c, CHARITY_PURPOSE),
+        **all_listed(f, "Charitable Purpose", by=REPORTING_YEAR),
+    },
+    "q10": lambda c: _top_groups_by_year(c, "Governing Form"),
+    "q11": _outliers_by_year,
+    "q12": lambda c: c.rollup([REPORTING_YEAR, "Country Established"])[CUBE_MEASURES],
+}
+
+
+def analyse_by_year(
+    file_3: pd.DataFrame, profiler: Optional[Profiler] = None, block: Optional[FinancialBlock] = None
+) -> Dict[str, Any]:
+    """Answer every question for each reporting year present in ``file_3``.
+
+    ``block`` is the :class:`FinancialBlock` of ``file_3`` grouped by
+    reporting year, if it was already built.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    if block is None:
+        with profiler.stage("financial block"):
+            block = FinancialBlock.from_frame(file_3, by=REPORTING_YEAR)
+    with profiler.stage("top-n rankings"):
+        rankings = top_n(file_3, RANKINGS_BY_YEAR.values(), n=TOP_N, columns=SUMMARY_COLUMNS)
+    with profiler.stage("aggregate cube"):
+        cube = AggregateCube.from_frame(file_3)
+    sources = {"rows": file_3, "rankings": rankings, "cube": cube, "block": block}
+    results = {}
+    for key, answer in ANSWERS_BY_YEAR.items():
+        with profiler.stage(f"analyse {key} by year"):
+            results[key] = answer(*QUESTIONS[key].inputs(sources))
+    return results
@@ -0,0 +1,120 @@
+"""IQR fences, outlier flags and winsorisation for the financial measures.
+
+Q11 of the notebook fences ``Total Gross Income`` alone with ``Q1 - 1.5 IQR``
+and ``Q3 + 1.5 IQR`` and caps a full copy of ``file_3`` at those limits.
+Here the quartiles of every measure come from one ``quantile([0.25, 0.75])``
+over the block of measure columns, optionally within each group (governing
+form, reporting year, ...). Flags are computed as one boolean block and
+winsorising replaces only the measure columns, clipped in place.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .columns import MEASURES
+
+FENCE_COLUMNS = ["Q1", "Q3", "IQR", "lower_limit", "upper_limit"]
+
+
+def iqr_fences(
+    file_3: pd.DataFrame, columns: Optional[List[str]] = None, by: Optional[str] = None, k: float = 1.5
+) -> pd.DataFrame:
+    """Return Q1, Q3, IQR and the lower and upper fences of each measure.
+
+    The result is indexed by measure, or by group and measure with ``by``;
+    its columns are :data:`FENCE_COLUMNS`. The fences lie ``k`` IQRs below
+    Q1 and above Q3.
+    """
+    columns = list(MEASURES if columns is None else columns)
+    if by is None:
+        quartiles = file_3[columns].quantile([0.25, 0.75])
+        q1, q3 = quartiles.loc[0.25], quartiles.loc[0.75]
+    else:
+        quartiles = file_3.groupby(by, observed=True)[columns].quantile([0.25, 0.75])
+        q1 = quartiles.xs(0.25, level=-1).stack()
+        q3 = quartiles.xs(0.75, level=-1).stack()
+    fences = pd.DataFrame({"Q1": q1, "Q3": q3})
+    fences["IQR"] = fences["Q3"] - fences["Q1"]
+    fences["lower_limit"] = fences["Q1"] - k * fences["IQR"]
+    fences["upper_limit"] = fences["Q3"] + k * fences["IQR"]
+    return fences.rename_axis(([by] if by else []) + ["measure"])
+
+
+def _bounds(
+    file_3: pd.DataFrame, fences: pd.DataFrame, columns: List[str], by: Optional[str]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Lower and upper bounds broadcastable against the rows x columns block.
+
+    Rows whose group has no fences get infinite bounds.
+    """
+    if by is None:
+        lower = fences.loc[columns, "lower_limit"].to_numpy()[np.newaxis, :]
+        upper = fences.loc[columns, "upper_limit"].to_numpy()[np.newaxis, :]
+        return lower, upper
+    lower_table = fences["lower_limit"].unstack(level=-1)[columns]
+    upper_table = fences["upper_limit"].unstack(level=-1)[columns]
+    codes = lower_table.index.get_indexer(file_3[by])
+    unbounded = np.full((1, len(columns)), np.inf)
+    lower = np.vstack([lower_table.to_numpy(), -unbounded])[codes]
+    upper = np.vstack([upper_table.to_numpy(), unbounded])[codes]
+    return lower, upper
+
+
+def flag_outliers(
+    file_3: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    by: Optional[str] = None,
+    k: float = 1.5,
+    fences: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Return a boolean frame marking the values outside their fences.
+
+    ``fences`` from :func:`iqr_fences` (with the same ``by``) can be passed
+    in to avoid recomputing them.
+    """
+    columns = list(MEASURES if columns is None else columns)
+    fences = iqr_fences(file_3, columns, by, k) if fences is None else fences
+    lower, upper = _bounds(file_3, fences, columns, by)
+    values = file_3[columns].to_numpy(dtype="float64", na_value=np.nan)
+    return pd.DataFrame((values < lower) | (values > upper), index=file_3.index, columns=columns)
+
+
+def outlier_sets(
+    file_3: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    by: Optional[str] = None,
+    k: float = 1.5,
+    fences: Optional[pd.DataFrame] = None,
+) -> Dict[str, pd.Index]:
+    """Return the index labels of the outlying rows, per measure."""
+    flags = flag_outliers(file_3, columns, by, k, fences)
+    return {column: file_3.index[flags[column].to_numpy()] for column in flags.columns}
+
+
+def winsorise(
+    file_3: pd.DataFrame,
+    columns: Optional[List[str]] = None,
+    by: Optional[str] = None,
+    k: float = 1.5,
+    fences: Optional[pd.DataFrame] = None,
+    inplace: bool = True,
+) -> pd.DataFrame:
+    """Cap every measure at its fences.
+
+    With ``inplace`` the measure columns of ``file_3`` are replaced by their
+    clipped values and ``file_3`` is returned; no other column is touched or
+    copied. Otherwise a new frame holding only the clipped measures is
+    returned.
+    """
+    columns = list(MEASURES if columns is None else columns)
+    fences = iqr_fences(file_3, columns, by, k) if fences is None else fences
+    lower, upper = _bounds(file_3, fences, columns, by)
+    target = file_3 if inplace else pd.DataFrame(index=file_3.index)
+    for position, column in enumerate(columns):
+        values = file_3[column].to_numpy(dtype="float64", na_value=np.nan)
+        target[column] = np.clip(values, lower[:, position], upper[:, position])
+    return target
@@ -0,0 +1,135 @@
+"""Clean the annual-reports file on several cores.
+
+The file is cut into byte ranges that end on row boundaries. A newline only
+ends a row when it is outside a quoted field, i.e. when the number of ``"``
+bytes since the previous boundary is even (an escaped ``""`` counts twice and
+keeps the parity). ISO-8859-1 is a single-byte encoding, so any byte offset
+is also a character boundary.
+
+Each worker process parses and cleans one range, with the banner and header
+rows put in front, and writes the cleaned frame as an Arrow IPC file. The
+parent memory-maps those files instead of receiving pickled frames, and
+concatenates them in file order. Row labels are shifted so they count rows
+across the whole file, as :func:`~irish_charities.load.read_annual_reports`
+does.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import pandas as pd
+
+from .clean import clean_annual_reports
+from .load import iter_annual_reports
+from .merge import concat_frames
+from .period import ReportingPeriod, ReportingYears
+from .snapshot import read_arrow, write_arrow
+
+# Ranges smaller than this are not worth a worker of their own.
+MIN_RANGE_BYTES = 1 << 20
+
+_SCAN_BLOCK = 1 << 20
+
+
+def _row_end(fh, start: int, position: int) -> int:
+    """Return the offset just past the first row ending at or after ``position``.
+
+    ``start`` must be the start of a row: quotes are counted from there, a
+    block at a time.
+    """
+    fh.seek(start)
+    quotes = 0
+    offset = start
+    while True:
+        block = fh.read(_SCAN_BLOCK)
+        if not block:
+            return offset
+        search = 0
+        if offset < position:
+            search = min(position - offset, len(block))
+            quotes += block.count(b'"', 0, search)
+        while search < len(block):
+            newline = block.find(b"\n", search)
+            if newline < 0:
+                quotes += block.count(b'"', search)
+                break
+            quotes += block.count(b'"', search, newline)
+            if quotes % 2 == 0:
+                return offset + newline + 1
+            search = newline + 1
+        offset += len(block)
+
+
+def byte_ranges(path: os.PathLike, parts: int) -> Tuple[bytes, List[Tuple[int, int]]]:
+    """Split the reports file into about ``parts`` ranges of whole rows.
+
+    Returns the banner and header bytes, which every range needs in front of
+    it to be parsed, and the ``(start, end)`` offsets of the data ranges.
+    """
+    with open(path, "rb") as fh:
+        banner_end = _row_end(fh, 0, 0)
+        data_start = _row_end(fh, banner_end, banner_end)
+        size = fh.seek(0, io.SEEK_END)
+        step = max((size - data_start) // max(parts, 1), MIN_RANGE_BYTES)
+        ranges = []
+        start = data_start
+        while start < size:
+            end = size if start + step >= size else _row_end(fh, start, start + step)
+            ranges.append((start, end))
+            start = end
+        fh.seek(0)
+        return fh.read(data_start), ranges
+
+
+def _clean_range(path: str, header: bytes, start: int, end: int, period, out_path: str) -> int:
+    """Parse and clean one byte range into ``out_path``; return its raw row count."""
+    with open(path, "rb") as fh:
+        fh.seek(start)
+        buffer = io.BytesIO(header + fh.read(end - start))
+    raw_2 = pd.concat(list(iter_annual_reports(buffer, period=None)))
+    rows = len(raw_2)
+    if period is not None:
+        raw_2 = raw_2[period.raw_mask(raw_2.iloc[:, 2], raw_2.iloc[:, 3])]
+    write_arrow(out_path, clean_annual_reports(raw_2, inplace=True))
+    return rows
+
+
+def clean_annual_reports_parallel(
+    path: os.PathLike,
+    period: Optional[Union[ReportingPeriod, ReportingYears]] = None,
+    workers: Optional[int] = None,
+    tmp_dir: Optional[os.PathLike] = None,
+) -> pd.DataFrame:
+    """Read and clean the reports file with ``workers`` processes.
+
+    The result equals ``clean_annual_reports(read_annual_reports(path,
+    period))``. ``workers`` defaults to the number of CPUs; ``tmp_dir`` is
+    where the intermediate Arrow files go (the system default if omitted).
+    """
+    workers = workers or os.cpu_count() or 1
+    header, ranges = byte_ranges(path, workers)
+    # A file without data rows still yields one empty range, so the result
+    # is an empty frame with the cleaned columns and dtypes.
+    ranges = ranges or [(len(header), len(header))]
+    with tempfile.TemporaryDirectory(dir=tmp_dir, prefix="irish-charities-") as scratch:
+        out_paths = [str(Path(scratch) / f"part-{i:05d}.arrow") for i in range(len(ranges))]
+        with ProcessPoolExecutor(max_workers=min(workers, len(ranges)) or 1) as pool:
+            futures = [
+                pool.submit(_clean_range, str(path), header, start, end, period, out_path)
+                for (start, end), out_path in zip(ranges, out_paths)
+            ]
+            row_counts = [future.result() for future in futures]
+        parts = []
+        offset = 0
+        for out_path, rows in zip(out_paths, row_counts):
+            part = read_arrow(out_path)
+            part.index += offset
+            offset += rows
+            parts.append(part)
+        return concat_frames(parts)
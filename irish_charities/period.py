@@ -0,0 +1,104 @@
+"""Reporting periods used to select annual reports.
+
+Both selectors offer ``raw_mask`` over the unparsed date strings, which the
+annual-reports reader applies chunk by chunk, and ``filter`` over a cleaned
+frame.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+
+import pandas as pd
+
+from .columns import PERIOD_END, PERIOD_START, REPORTING_YEAR
+
+# Dates in charity-annual-reports.csv are written as dd/mm/yyyy, nearly always
+# zero-padded; strptime also accepts them unpadded (1/7/2020).
+RAW_DATE_FORMAT = "%d/%m/%Y"
+PADDED_DATE_LENGTH = 10
+
+
+@dataclass(frozen=True)
+class ReportingPeriod:
+    """An annual report's exact start and end dates, e.g. calendar 2021."""
+
+    start: date
+    end: date
+
+    @classmethod
+    def calendar_year(cls, year: int) -> "ReportingPeriod":
+        return cls(date(year, 1, 1), date(year, 12, 31))
+
+    def __str__(self) -> str:
+        return f"{self.start.isoformat()}..{self.end.isoformat()}"
+
+    @property
+    def key(self) -> str:
+        """Short identifier usable in file names."""
+        return f"{self.start:%Y%m%d}_{self.end:%Y%m%d}"
+
+    def raw_mask(self, start: pd.Series, end: pd.Series) -> pd.Series:
+        """Boolean mask over the unparsed dd/mm/yyyy date strings.
+
+        Zero-padded dates are compared as strings. The rows with a shorter,
+        unpadded date are parsed and compared as dates, so they are kept
+        exactly when the parsed report would be.
+        """
+        mask = (start == self.start.strftime(RAW_DATE_FORMAT)) & (end == self.end.strftime(RAW_DATE_FORMAT))
+        unpadded = ~mask & ((start.str.len() < PADDED_DATE_LENGTH) | (end.str.len() < PADDED_DATE_LENGTH))
+        if unpadded.any():
+            starts = pd.to_datetime(start[unpadded], format=RAW_DATE_FORMAT, errors="coerce")
+            ends = pd.to_datetime(end[unpadded], format=RAW_DATE_FORMAT, errors="coerce")
+            mask[unpadded] = (starts == pd.Timestamp(self.start)) & (ends == pd.Timestamp(self.end))
+        return mask
+
+    def filter(self, file_2: pd.DataFrame) -> pd.DataFrame:
+        """Select the rows of a cleaned File 2 frame that cover this period."""
+        return file_2.loc[
+            (file_2[PERIOD_START] == pd.Timestamp(self.start)) & (file_2[PERIOD_END] == pd.Timestamp(self.end))
+        ]
+
+
+@dataclass(frozen=True)
+class ReportingYears:
+    """Every report whose period ends in ``first``..``last``, inclusive.
+
+    The reporting year of a report is the year its period ends, so a
+    July 2020 - June 2021 financial year counts towards 2021 alongside the
+    calendar year 2021.
+    """
+
+    first: int
+    last: int
+
+    def __post_init__(self) -> None:
+        if self.first > self.last:
+            raise ValueError(f"The span {self.first}-{self.last} ends before it starts")
+
+    @classmethod
+    def parse(cls, text: str) -> "ReportingYears":
+        """Parse "2014-2023" or a single year such as "2021"."""
+        first, dash, last = text.strip().partition("-")
+        if not first.isdigit() or (dash and not last.isdigit()):
+            raise ValueError(f"Expected a year or a span such as 2014-2023, got {text!r}")
+        return cls(int(first), int(last or first))
+
+    def __str__(self) -> str:
+        return f"{self.first}-{self.last}"
+
+    @property
+    def key(self) -> str:
+        return f"years_{self.first}_{self.last}"
+
+    @property
+    def years(self) -> range:
+        return range(self.first, self.last + 1)
+
+    def raw_mask(self, start: pd.Series, end: pd.Series) -> pd.Series:
+        """Boolean mask over the unparsed dd/mm/yyyy end-date strings."""
+        return end.str[-4:].isin([str(year) for year in self.years])
+
+    def filter(self, file_2: pd.DataFrame) -> pd.DataFrame:
+        return file_2.loc[file_2[REPORTING_YEAR].between(self.first, self.last)]
@@ -0,0 +1,265 @@
+"""Run the whole analysis: load, clean, merge, analyse, report.
+
+Each stage is a plain function so it can be run, timed or reused on its own;
+:func:`run` chains them for one reporting period, recording every stage in
+an optional :class:`~irish_charities.profiling.Profiler`.
+
+The two source files are independent until the merge, so
+:func:`load_clean_parallel` downloads them in two threads and reads and cleans
+each one in its own worker process as soon as its download is done.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Union
+
+import pandas as pd
+
+from .analyse import analyse
+from .charts import write_charts
+from .clean import clean_annual_reports, clean_register
+from .columns import REPORTING_YEAR
+from .download import ANNUAL_REPORTS_URL, REGISTER_URL, DownloadCache
+from .financials import FinancialBlock
+from .incremental import IncrementalState, RefreshResult
+from .load import read_annual_reports, read_register
+from .merge import add_derived_columns, merge
+from .multiyear import analyse_by_year
+from .parallel import clean_annual_reports_parallel
+from .period import ReportingPeriod, ReportingYears
+from .profiling import Profiler
+from .report import write_report
+from .snapshot import SnapshotStore, source_version
+from .textindex import text_postings
+
+
+def enable_copy_on_write() -> bool:
+    """Switch pandas to copy-on-write where it is optional; return whether it is on.
+
+    Copy-on-write is opt-in from pandas 2.0 and always on from 3.0. With it,
+    the shallow copies and shared columns of the cleaning and the merge hold
+    no data of their own until a column is written.
+    """
+    major = int(pd.__version__.split(".")[0])
+    if major == 2:
+        pd.set_option("mode.copy_on_write", True)
+    return major >= 2
+
+
+class Sources(NamedTuple):
+    """Local paths of the two downloaded CSV files."""
+
+    register: Path
+    annual_reports: Path
+
+
+def fetch_sources(cache: Optional[DownloadCache] = None) -> Sources:
+    cache = cache or DownloadCache()
+    return Sources(cache.fetch(REGISTER_URL), cache.fetch(ANNUAL_REPORTS_URL))
+
+
+Period = Union[ReportingPeriod, ReportingYears]
+
+
+def load(sources: Sources, period: Period) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Read the raw register and the raw reports for ``period``."""
+    return read_register(sources.register), read_annual_reports(sources.annual_reports, period=period)
+
+
+def clean(raw_1: pd.DataFrame, raw_2: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    return clean_register(raw_1), clean_annual_reports(raw_2)
+
+
+def load_clean(
+    sources: Sources,
+    period: Period,
+    snapshots: Optional[SnapshotStore] = None,
+    profiler: Optional[Profiler] = None,
+    workers: Optional[int] = None,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Load and clean both files, going through ``snapshots`` when given.
+
+    The period filter runs inside the reports reader, so it is timed as
+    part of "load reports". With more than one of ``workers`` the reports
+    are read and cleaned in that many processes, as a single stage. The raw
+    frames are cleaned in place and dropped straight after, so they never
+    coexist with the next file. With ``snapshots`` the postings of the
+    full-text indexes (see :func:`~irish_charities.textindex.text_postings`)
+    are built and snapshotted alongside, the first time only.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    if snapshots is None:
+        with profiler.stage("load register") as stage:
+            raw_1 = read_register(sources.register)
+            stage.frame(raw_1)
+        with profiler.stage("clean register") as stage:
+            file_1 = clean_register(raw_1, inplace=True)
+            stage.frame(file_1)
+        del raw_1
+        if workers is not None and workers > 1:
+            with profiler.stage(f"load and clean reports ({workers} workers)") as stage:
+                file_2 = clean_annual_reports_parallel(sources.annual_reports, period, workers)
+                stage.frame(file_2)
+            return file_1, file_2
+        with profiler.stage("load reports") as stage:
+            raw_2 = read_annual_reports(sources.annual_reports, period=period)
+            stage.frame(raw_2)
+        with profiler.stage("clean reports") as stage:
+            file_2 = clean_annual_reports(raw_2, inplace=True)
+            stage.frame(file_2)
+        del raw_2
+        return file_1, file_2
+
+    with profiler.stage("register snapshot") as stage:
+        file_1 = _clean_register_file(sources.register, snapshots)
+        stage.frame(file_1)
+    with profiler.stage("reports snapshot") as stage:
+        file_2 = _clean_reports_file(sources.annual_reports, period, snapshots, workers)
+        stage.frame(file_2)
+    with profiler.stage("text index snapshots"):
+        text_postings(file_1, file_2, sources, period, snapshots)
+    return file_1, file_2
+
+
+def _clean_register_file(path: Path, snapshots: Optional[SnapshotStore] = None) -> pd.DataFrame:
+    if snapshots is None:
+        return clean_register(read_register(path), inplace=True)
+    return snapshots.get_or_build("register", path, lambda p: clean_register(read_register(p), inplace=True))
+
+
+def _read_clean_reports(path: Path, period: Period, workers: Optional[int] = None) -> pd.DataFrame:
+    if workers is not None and workers > 1:
+        return clean_annual_reports_parallel(path, period, workers)
+    return clean_annual_reports(read_annual_reports(path, period=period), inplace=True)
+
+
+def _clean_reports_file(
+    path: Path, period: Period, snapshots: Optional[SnapshotStore] = None, workers: Optional[int] = None
+) -> pd.DataFrame:
+    if snapshots is None:
+        return _read_clean_reports(path, period, workers)
+    return snapshots.get_or_build(
+        f"annual-reports_{period.key}", path, lambda p: _read_clean_reports(p, period, workers)
+    )
+
+
+def _fetch_then(cache: DownloadCache, url: str, processes: Executor, task, *args) -> Tuple[Path, pd.DataFrame]:
+    path = cache.fetch(url)
+    return path, processes.submit(task, path, *args).result()
+
+
+def load_clean_parallel(
+    period: Period,
+    cache: Optional[DownloadCache] = None,
+    snapshots: Optional[SnapshotStore] = None,
+    workers: Optional[int] = None,
+) -> Tuple[Sources, pd.DataFrame, pd.DataFrame]:
+    """Fetch, load and clean both files concurrently.
+
+    Each file is downloaded in its own thread and handed to its own worker
+    process as soon as it is on disk, so the reports are parsed while the
+    register is still being cleaned (or downloaded). The two only meet again
+    at the merge. With ``workers`` the reports are in turn cleaned in that
+    many processes (see :mod:`~irish_charities.parallel`). With
+    ``snapshots`` the full-text postings are snapshotted too, as by
+    :func:`load_clean`. Returns the sources and the cleaned File 1 and File 2.
+    """
+    cache = cache or DownloadCache()
+    with ThreadPoolExecutor(max_workers=2) as downloads, ProcessPoolExecutor(max_workers=2) as processes:
+        register = downloads.submit(_fetch_then, cache, REGISTER_URL, processes, _clean_register_file, snapshots)
+        reports = downloads.submit(
+            _fetch_then, cache, ANNUAL_REPORTS_URL, processes, _clean_reports_file, period, snapshots, workers
+        )
+        (register_path, file_1), (reports_path, file_2) = register.result(), reports.result()
+    sources = Sources(register_path, reports_path)
+    if snapshots is not None:
+        text_postings(file_1, file_2, sources, period, snapshots)
+    return sources, file_1, file_2
+
+
+def run(
+    period: Period,
+    out_dir: Optional[os.PathLike] = None,
+    cache: Optional[DownloadCache] = None,
+    snapshots: Optional[SnapshotStore] = None,
+    charts: bool = False,
+    profiler: Optional[Profiler] = None,
+    parallel: bool = False,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Run the pipeline for ``period``; write the answers if ``out_dir`` is set.
+
+    ``period`` is either one exact :class:`ReportingPeriod` or a span of
+    :class:`ReportingYears`, in which case every answer is indexed by year.
+    With ``charts`` the PNG charts are drawn into ``out_dir`` as well; only
+    then are matplotlib and seaborn imported. With ``parallel`` both files
+    are fetched, loaded and cleaned concurrently by
+    :func:`load_clean_parallel`, timed as a single stage. ``workers`` is
+    the number of processes cleaning the reports file. The
+    :class:`~irish_charities.financials.FinancialBlock` is built once and
+    shared by Q1 and the financials boxplot.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    by_year = isinstance(period, ReportingYears)
+    if by_year and charts:
+        raise ValueError("Charts are only drawn for a single reporting period")
+    if parallel:
+        with profiler.stage("fetch, load and clean in parallel"):
+            _, file_1, file_2 = load_clean_parallel(period, cache, snapshots, workers)
+    else:
+        with profiler.stage("fetch sources"):
+            sources = fetch_sources(cache)
+        file_1, file_2 = load_clean(sources, period, snapshots, profiler, workers)
+    with profiler.stage("merge") as stage:
+        file_3 = add_derived_columns(merge(file_1, file_2))
+        stage.frame(file_3)
+    with profiler.stage("financial block"):
+        block = FinancialBlock.from_frame(file_3, by=REPORTING_YEAR if by_year else None)
+    results = analyse_by_year(file_3, profiler, block) if by_year else analyse(file_3, profiler, block)
+    if out_dir is not None:
+        with profiler.stage("report"):
+            write_report(results, out_dir, period)
+        if charts:
+            write_charts(file_3, results, out_dir, profiler=profiler, block=block)
+    return results
+
+
+def run_incremental(
+    period: Period,
+    state_dir: os.PathLike,
+    out_dir: Optional[os.PathLike] = None,
+    cache: Optional[DownloadCache] = None,
+    snapshots: Optional[SnapshotStore] = None,
+    profiler: Optional[Profiler] = None,
+) -> RefreshResult:
+    """Refresh the incremental state in ``state_dir`` and answer the questions.
+
+    Only reports filed or changed since the last refresh are cleaned and
+    merged (see :mod:`~irish_charities.incremental`). With ``out_dir`` the
+    answers and the delta-maintained aggregates are written there.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    with profiler.stage("fetch sources"):
+        sources = fetch_sources(cache)
+    with profiler.stage("register snapshot" if snapshots else "load and clean register") as stage:
+        file_1 = _clean_register_file(sources.register, snapshots)
+        stage.frame(file_1)
+    with profiler.stage("incremental refresh") as stage:
+        result = IncrementalState(state_dir, period).refresh(
+            file_1, source_version(sources.register), sources.annual_reports
+        )
+        stage.frame(result.file_3)
+    file_3 = result.file_3.reset_index(drop=True)
+    if isinstance(period, ReportingYears):
+        results = analyse_by_year(file_3, profiler)
+    else:
+        results = analyse(file_3, profiler)
+    if out_dir is not None:
+        with profiler.stage("report"):
+            write_report(results, out_dir, period)
+            for name, frame in result.aggregates.items():
+                frame.to_csv(Path(out_dir) / f"aggregates_{name}.csv")
+    return result
@@ -0,0 +1,218 @@
+"""Per-stage timing and memory instrumentation for the pipeline.
+
+Wrap each stage in ``with profiler.stage(name) as stage:`` and, where the
+stage produces a DataFrame, call ``stage.frame(df)``. For every stage the
+profiler records wall time, CPU time, the process's peak resident set size
+once the stage finished, and the row count and in-memory size of the frame.
+The frame is only measured after the timers have stopped.
+
+With ``trace_memory`` the profiler also keeps a memory budget: ``tracemalloc``
+is started and its peak reset as each stage begins, so every stage reports
+the most Python and NumPy memory held at any point during it and the amount
+still held at its end. Arrow buffers (the ``string`` columns and snapshots)
+are allocated outside the Python heap, so the Arrow memory pool's allocation
+at the end of the stage is recorded next to them. Nested stages each report
+their own peak, and an enclosing stage's peak includes its inner stages'.
+
+``tracemalloc`` only sees this process. The worker processes of
+``--parallel`` and ``--workers`` are measured by their peak resident set
+size instead, which the operating system reports for children that have
+exited; a stage whose workers finished records the largest such peak if it
+exceeds every earlier worker's. :meth:`Profiler.budget` compares the larger
+of the traced and worker peaks with the size of the largest frame produced,
+which for a full run is the merged frame.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+
+def peak_rss_bytes(who: str = "self") -> Optional[int]:
+    """Return the peak resident set size of this process, if available.
+
+    With ``who="children"``, the largest peak of any child process that has
+    exited and been waited for (0 if none has).
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if who == "children" else resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def arrow_allocated_bytes() -> Optional[int]:
+    """Return the bytes allocated by Arrow's default memory pool, if pyarrow is loaded."""
+    pyarrow = sys.modules.get("pyarrow")
+    return None if pyarrow is None else pyarrow.total_allocated_bytes()
+
+
+@dataclass
+class StageRecord:
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: Optional[int] = None
+    rows: Optional[int] = None
+    frame_bytes: Optional[int] = None
+    traced_peak_bytes: Optional[int] = None
+    traced_bytes: Optional[int] = None
+    arrow_bytes: Optional[int] = None
+    worker_peak_rss_bytes: Optional[int] = None
+    _frame: Optional[pd.DataFrame] = field(default=None, repr=False, compare=False)
+
+    def frame(self, frame: pd.DataFrame) -> None:
+        """Attach the frame this stage produced; it is measured on exit."""
+        self._frame = frame
+
+    def to_dict(self) -> dict:
+        record = asdict(self)
+        del record["_frame"]
+        return record
+
+
+class Profiler:
+    """Collect a :class:`StageRecord` for each named stage.
+
+    A disabled profiler hands out records but measures nothing, so code can
+    be instrumented unconditionally. ``trace_memory`` adds the per-stage
+    memory budget; tracing slows allocation-heavy stages down noticeably.
+    """
+
+    def __init__(self, enabled: bool = True, trace_memory: bool = False) -> None:
+        self.enabled = enabled
+        self.trace_memory = enabled and trace_memory
+        self.records: List[StageRecord] = []
+        # The traced peaks of the open stages, outermost first, up to the
+        # last time an inner stage reset tracemalloc's peak.
+        self._open_peaks: List[int] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        record = StageRecord(name)
+        if not self.enabled:
+            yield record
+            return
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            if self._open_peaks:
+                self._open_peaks[-1] = max(self._open_peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._open_peaks.append(0)
+            workers_before = peak_rss_bytes("children")
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield record
+        finally:
+            record.wall_seconds = time.perf_counter() - wall
+            record.cpu_seconds = time.process_time() - cpu
+            record.peak_rss_bytes = peak_rss_bytes()
+            if self.trace_memory:
+                record.traced_bytes, peak = tracemalloc.get_traced_memory()
+                record.traced_peak_bytes = max(peak, self._open_peaks.pop())
+                if self._open_peaks:
+                    self._open_peaks[-1] = max(self._open_peaks[-1], record.traced_peak_bytes)
+                record.arrow_bytes = arrow_allocated_bytes()
+                workers_after = peak_rss_bytes("children")
+                if workers_after and workers_after > (workers_before or 0):
+                    record.worker_peak_rss_bytes = workers_after
+            if record._frame is not None:
+                record.rows = len(record._frame)
+                record.frame_bytes = int(record._frame.memory_usage(deep=True).sum())
+                record._frame = None
+            self.records.append(record)
+
+    def budget(self) -> Optional[dict]:
+        """The peak memory of the run against the size of the largest frame.
+
+        The peak is the largest traced peak plus the Arrow allocation of the
+        same stage, or the largest worker process peak if that is higher.
+        ``None`` unless memory was traced.
+        """
+        traced = [record for record in self.records if record.traced_peak_bytes is not None]
+        if not traced:
+            return None
+        peak = max(traced, key=lambda record: record.traced_peak_bytes + (record.arrow_bytes or 0))
+        peak_bytes, peak_stage = peak.traced_peak_bytes + (peak.arrow_bytes or 0), peak.name
+        workers = [record for record in traced if record.worker_peak_rss_bytes is not None]
+        worker_peak = max(workers, key=lambda record: record.worker_peak_rss_bytes) if workers else None
+        if worker_peak is not None and worker_peak.worker_peak_rss_bytes > peak_bytes:
+            peak_bytes, peak_stage = worker_peak.worker_peak_rss_bytes, f"{worker_peak.name} (worker)"
+        data_bytes = max((record.frame_bytes or 0 for record in self.records), default=0)
+        return {
+            "peak_bytes": peak_bytes,
+            "peak_stage": peak_stage,
+            "worker_peak_bytes": worker_peak.worker_peak_rss_bytes if worker_peak is not None else None,
+            "data_bytes": data_bytes,
+            "peak_to_data": peak_bytes / data_bytes if data_bytes else None,
+        }
+
+    def to_dict(self) -> dict:
+        result = {
+            "total_wall_seconds": sum(record.wall_seconds for record in self.records),
+            "stages": [record.to_dict() for record in self.records],
+        }
+        if self.trace_memory:
+            result["memory_budget"] = self.budget()
+        return result
+
+    def write_json(self, path: os.PathLike) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.to_dict(), fh, indent=2)
+
+    def table(self) -> str:
+        """Return the records as a fixed-width, human-readable table."""
+
+        def mb(value: Optional[int]) -> str:
+            return "" if value is None else f"{value / 1e6:,.1f}"
+
+        header = ("stage", "wall s", "cpu s", "peak RSS MB", "rows", "frame MB")
+        if self.trace_memory:
+            header += ("traced peak MB", "held MB", "arrow MB", "worker RSS MB")
+        rows = []
+        for record in self.records:
+            row = (
+                record.name,
+                f"{record.wall_seconds:.3f}",
+                f"{record.cpu_seconds:.3f}",
+                mb(record.peak_rss_bytes),
+                "" if record.rows is None else f"{record.rows:,}",
+                mb(record.frame_bytes),
+            )
+            if self.trace_memory:
+                row += (
+                    mb(record.traced_peak_bytes),
+                    mb(record.traced_bytes),
+                    mb(record.arrow_bytes),
+                    mb(record.worker_peak_rss_bytes),
+                )
+            rows.append(row)
+        widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+        lines = []
+        for row in [header] + rows:
+            cells = [row[0].ljust(widths[0])] + [cell.rjust(width) for cell, width in zip(row[1:], widths[1:])]
+            lines.append("  ".join(cells))
+        lines.insert(1, "  ".join("-" * width for width in widths))
+        budget = self.budget() if self.trace_memory else None
+        if budget is not None and budget["peak_to_data"] is not None:
+            lines.append(
+                f"peak {mb(budget['peak_bytes'])} MB in {budget['peak_stage']!r}, "
+                f"{budget['peak_to_data']:.1f}x the largest frame ({mb(budget['data_bytes'])} MB)"
+            )
+        return "\n".join(lines)
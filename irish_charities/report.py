@@ -0,0 +1,47 @@
+"""Write the answers to the questions as files.
+
+Tables go to one CSV per question (or per part, e.g. ``q08_count.csv``) and
+scalar answers, titles and the list of files go to ``summary.json``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import pandas as pd
+
+from .analyse import QUESTIONS
+from .period import ReportingPeriod, ReportingYears
+
+
+def write_report(
+    results: Dict[str, Any],
+    out_dir: os.PathLike,
+    period: Optional[Union[ReportingPeriod, ReportingYears]] = None,
+) -> List[Path]:
+    """Write ``results`` from :func:`~irish_charities.analyse.analyse` to ``out_dir``."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    written = []
+    summary: Dict[str, Any] = {"period": str(period) if period else None, "questions": {}}
+    for key, result in results.items():
+        entry: Dict[str, Any] = {"title": QUESTIONS[key].title}
+        parts = result if isinstance(result, dict) else {"": result}
+        for part, value in parts.items():
+            name = f"{key}_{part}" if part else key
+            if isinstance(value, (pd.DataFrame, pd.Series)):
+                path = out_dir / f"{name}.csv"
+                value.to_csv(path)
+                written.append(path)
+                entry.setdefault("files", []).append(path.name)
+            else:
+                entry["value"] = value
+        summary["questions"][key] = entry
+    path = out_dir / "summary.json"
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(summary, fh, indent=2)
+    written.append(path)
+    return written
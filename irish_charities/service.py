@@ -0,0 +1,389 @@
+"""A long-lived HTTP service answering queries over the merged frame.
+
+:class:`QueryService` loads and merges the data for one period once, builds
+the :class:`~irish_charities.cube.AggregateCube` and a charity-number index,
+and keeps them in memory. Each query is answered from those structures and
+the encoded JSON response is kept in an LRU cache keyed by the query and the
+versions of the source files.
+
+A watcher thread re-fetches the sources every ``reload_interval`` seconds
+(through the download cache, so usually without a download) and, when either
+file's content hash changed, loads the new data in the background and swaps
+it in; queries keep being served from the old data until then, or for good
+if the reload fails (the failure is logged on the ``irish_charities.service``
+logger).
+
+:func:`make_server` wraps a service in a threaded ``http.server``. Every
+endpoint is a GET returning JSON:
+
+``/health``
+    The period, source versions, load time and row count.
+``/top?measure=Total+Gross+Income&n=5&ascending=0&by=Governing+Form&year=2021``
+    The ``n`` charities with the largest (smallest) measure, optionally per
+    group and for one reporting year.
+``/rollup?by=Country+Established&by=Reporting+Year&Status=Registered``
+    Report counts, and the sums and non-missing counts of every measure,
+    grouped by cube dimensions; any other parameter named after a dimension
+    filters on it.
+``/charity/<number>``
+    Every report of one charity.
+``/outliers?measure=Total+Gross+Income&by=Reporting+Year&k=1.5``
+    The IQR fences and the charities outside them.
+``/search?q=vincent+de+paul&limit=10``
+    Charities matching a (partial or misspelt) name, from the
+    :class:`~irish_charities.search.NameIndex` of the register.
+``/text?q=homeless+-sport&field=objects&ranked=0&limit=10``
+    Charities whose objects (or, with ``field=activities``, activity
+    descriptions) match a boolean or, with ``ranked=1``, BM25 query from the
+    :class:`~irish_charities.textindex.TextIndex`, and the sums of every
+    measure over their reports.
+
+Bad parameters get a 400 response and unknown charities or paths a 404, both
+with an ``{"error": ...}`` body.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pandas as pd
+
+from .analyse import SUMMARY_COLUMNS, TOP_N
+from .columns import CHARITY_NUMBER, REPORTING_YEAR
+from .cube import CUBE_DIMENSIONS, CUBE_MEASURES, AggregateCube
+from .download import DownloadCache
+from .merge import add_derived_columns, merge
+from .outliers import flag_outliers, iqr_fences
+from .pipeline import Period, fetch_sources, load_clean
+from .search import NameIndex
+from .snapshot import SnapshotStore, source_version
+from .textindex import TEXT_FIELDS, TextIndex, text_indexes
+from .topn import Ranking, top_n
+
+DEFAULT_CACHE_SIZE = 256
+
+logger = logging.getLogger(__name__)
+
+
+class _Data(NamedTuple):
+    file_3: pd.DataFrame
+    cube: AggregateCube
+    charities: Dict[int, Any]
+    names: NameIndex
+    texts: Dict[str, TextIndex]
+    versions: Tuple[str, str]
+    loaded_at: str
+
+
+def _records(frame: pd.DataFrame) -> str:
+    """Encode ``frame`` (index included) as a JSON array of objects."""
+    if any(name is not None for name in frame.index.names):
+        frame = frame.reset_index()
+    return frame.to_json(orient="records", date_format="iso")
+
+
+class QueryService:
+    """Answer top-N, roll-up, charity, outlier, name and text queries for ``period``.
+
+    Parameters
+    ----------
+    period:
+        The reporting period or span of years to load.
+    cache, snapshots:
+        Where sources are downloaded and cleaned snapshots kept, as for
+        :func:`~irish_charities.pipeline.run`.
+    cache_size:
+        How many encoded responses the LRU result cache holds.
+    """
+
+    def __init__(
+        self,
+        period: Period,
+        cache: Optional[DownloadCache] = None,
+        snapshots: Optional[SnapshotStore] = None,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+    ) -> None:
+        self.period = period
+        self.cache = cache or DownloadCache()
+        self.snapshots = snapshots
+        self.cache_size = cache_size
+        self._results: "OrderedDict[tuple, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._data = self._load()
+
+    def _load(self) -> _Data:
+        sources = fetch_sources(self.cache)
+        file_1, file_2 = load_clean(sources, self.period, self.snapshots)
+        file_3 = add_derived_columns(merge(file_1, file_2))
+        charities = file_3.groupby(CHARITY_NUMBER).indices
+        return _Data(
+            file_3=file_3,
+            cube=AggregateCube.from_frame(file_3),
+            charities=charities,
+            names=NameIndex.from_register(file_1),
+            texts=text_indexes(file_1, file_2, sources, self.period, self.snapshots),
+            versions=(source_version(sources.register), source_version(sources.annual_reports)),
+            loaded_at=time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        )
+
+    def reload_if_changed(self) -> bool:
+        """Reload the data if a source file changed; return whether it did."""
+        with self._reload_lock:
+            sources = fetch_sources(self.cache)
+            versions = (source_version(sources.register), source_version(sources.annual_reports))
+            if versions == self._data.versions:
+                return False
+            data = self._load()
+            with self._lock:
+                self._data = data
+                self._results.clear()
+            return True
+
+    def watch(self, interval: float) -> threading.Thread:
+        """Start a daemon thread calling :meth:`reload_if_changed` every ``interval`` s."""
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                try:
+                    self.reload_if_changed()
+                except Exception:  # keep serving the loaded data
+                    logger.exception("Reload failed; still serving the data loaded at %s", self._data.loaded_at)
+
+        thread = threading.Thread(target=loop, name="irish-charities-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _cached(self, key: tuple, compute: Callable[[_Data], str]) -> str:
+        data = self._data
+        key = (data.versions,) + key
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        body = compute(data)
+        with self._lock:
+            self._results[key] = body
+            while len(self._results) > self.cache_size:
+                self._results.popitem(last=False)
+        return body
+
+    def health(self) -> str:
+        data = self._data
+        return json.dumps(
+            {
+                "period": str(self.period),
+                "versions": {"register": data.versions[0], "annual_reports": data.versions[1]},
+                "loaded_at": data.loaded_at,
+                "rows": len(data.file_3),
+                "cached_results": len(self._results),
+            }
+        )
+
+    def top(
+        self,
+        measure: str,
+        n: int = TOP_N,
+        ascending: bool = False,
+        by: Optional[str] = None,
+        year: Optional[int] = None,
+    ) -> str:
+        """The ``n`` best charities by ``measure``, as JSON records."""
+        _check_measure(measure)
+        if by is not None:
+            _check_dimensions([by])
+        if n < 1:
+            raise ValueError("n must be at least 1")
+
+        def compute(data: _Data) -> str:
+            file_3 = data.file_3
+            if year is not None:
+                file_3 = file_3[file_3[REPORTING_YEAR] == year]
+            columns = [REPORTING_YEAR] + SUMMARY_COLUMNS
+            ranked = top_n(file_3, [Ranking(measure, ascending, by)], n=n, columns=columns)
+            return _records(next(iter(ranked.values())).reset_index(drop=True))
+
+        return self._cached(("top", measure, n, ascending, by, year), compute)
+
+    def rollup(self, by: List[str], where: Optional[Dict[str, List[Any]]] = None) -> str:
+        """Counts and sums grouped by the cube dimensions ``by``, as JSON records."""
+        _check_dimensions(by)
+        where = where or {}
+        _check_dimensions(list(where))
+        key = ("rollup", tuple(by), tuple(sorted((k, tuple(v)) for k, v in where.items())))
+        return self._cached(key, lambda data: _records(data.cube.rollup(by, where)))
+
+    def charity(self, number: int) -> str:
+        """Every report of charity ``number``; ``KeyError`` if it has none."""
+
+        def compute(data: _Data) -> str:
+            positions = data.charities.get(number)
+            if positions is None:
+                raise KeyError(f"No reports for charity {number}")
+            return _records(data.file_3.iloc[positions].reset_index(drop=True))
+
+        return self._cached(("charity", number), compute)
+
+    def outliers(self, measure: str = "Total Gross Income", by: Optional[str] = None, k: float = 1.5) -> str:
+        """The IQR fences of ``measure`` and the charities outside them."""
+        _check_measure(measure)
+        if k < 0:
+            raise ValueError("k must not be negative")
+        if by is not None:
+            _check_dimensions([by])
+
+        def compute(data: _Data) -> str:
+            fences = iqr_fences(data.file_3, [measure], by, k)
+            flags = flag_outliers(data.file_3, [measure], by, k, fences=fences)
+            rows = data.file_3.loc[flags[measure], [REPORTING_YEAR] + SUMMARY_COLUMNS]
+            return '{"fences": %s, "outliers": %s}' % (_records(fences), _records(rows.reset_index(drop=True)))
+
+        return self._cached(("outliers", measure, by, k), compute)
+
+    def search(self, query: str, limit: int = 10) -> str:
+        """Charities whose name or also-known-as name matches ``query``."""
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        matches = self._data.names.search(query, limit)
+        return json.dumps([match._asdict() for match in matches])
+
+    def text(self, query: str, field: str = "objects", ranked: bool = False, limit: int = 10) -> str:
+        """Charities whose ``field`` text matches ``query``, with their summed measures.
+
+        Boolean queries return every match; ranked ones the best ``limit``.
+        """
+        if field not in TEXT_FIELDS:
+            raise ValueError(f"Unknown text field {field!r}; expected one of {list(TEXT_FIELDS)}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+
+        def compute(data: _Data) -> str:
+            index = data.texts[field]
+            if ranked:
+                scores = index.ranked(query, limit)
+            else:
+                numbers = index.boolean(query)
+                scores = pd.Series(1.0, index=pd.Index(numbers, name=CHARITY_NUMBER), name="score")
+            reports = data.file_3[data.file_3[CHARITY_NUMBER].isin(scores.index)]
+            totals = reports[CUBE_MEASURES].sum().to_dict()
+            return json.dumps(
+                {
+                    "charities": len(scores),
+                    "reports": len(reports),
+                    "totals": totals,
+                    "matches": [{"number": int(n), "score": float(s)} for n, s in scores.items()],
+                }
+            )
+
+        return self._cached(("text", query, field, ranked, limit if ranked else None), compute)
+
+
+def _check_measure(measure: str) -> None:
+    if measure not in CUBE_MEASURES:
+        raise ValueError(f"Unknown measure {measure!r}; expected one of {CUBE_MEASURES}")
+
+
+def _check_dimensions(dimensions: List[str]) -> None:
+    unknown = [dimension for dimension in dimensions if dimension not in CUBE_DIMENSIONS]
+    if unknown:
+        raise ValueError(f"Unknown dimension(s) {unknown}; expected some of {CUBE_DIMENSIONS}")
+
+
+def _flag(params: Dict[str, List[str]], name: str) -> bool:
+    return params.get(name, ["0"])[-1].lower() in ("1", "true", "yes")
+
+
+def _optional(
+    params: Dict[str, List[str]], name: str, convert: Callable[[str], Any] = str, default: Any = None
+) -> Any:
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        return convert(values[-1])
+    except ValueError:
+        raise ValueError(f"Invalid value for {name}: {values[-1]!r}") from None
+
+
+def _where(params: Dict[str, List[str]]) -> Dict[str, List[Any]]:
+    where: Dict[str, List[Any]] = {}
+    for dimension in CUBE_DIMENSIONS:
+        if dimension in params:
+            convert = int if dimension == REPORTING_YEAR else str
+            where[dimension] = [convert(value) for value in params[dimension]]
+    return where
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: QueryService
+
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        path = unquote(url.path).rstrip("/")
+        try:
+            if path == "/health":
+                body = self.service.health()
+            elif path == "/top":
+                body = self.service.top(
+                    measure=_optional(params, "measure", default="Total Gross Income"),
+                    n=_optional(params, "n", int, TOP_N),
+                    ascending=_flag(params, "ascending"),
+                    by=_optional(params, "by"),
+                    year=_optional(params, "year", int),
+                )
+            elif path == "/rollup":
+                body = self.service.rollup(params.get("by", []), _where(params))
+            elif path.startswith("/charity/"):
+                body = self.service.charity(int(path[len("/charity/"):]))
+            elif path == "/outliers":
+                body = self.service.outliers(
+                    measure=_optional(params, "measure", default="Total Gross Income"),
+                    by=_optional(params, "by"),
+                    k=_optional(params, "k", float, 1.5),
+                )
+            elif path == "/search":
+                body = self.service.search(_optional(params, "q", default=""), _optional(params, "limit", int, 10))
+            elif path == "/text":
+                body = self.service.text(
+                    _optional(params, "q", default=""),
+                    field=_optional(params, "field", default="objects"),
+                    ranked=_flag(params, "ranked"),
+                    limit=_optional(params, "limit", int, 10),
+                )
+            else:
+                raise KeyError(f"Unknown path {url.path}")
+        except KeyError as exc:
+            self._send(404, json.dumps({"error": exc.args[0]}))
+        except ValueError as exc:
+            self._send(400, json.dumps({"error": str(exc)}))
+        else:
+            self._send(200, body)
+
+    def _send(self, status: int, body: str) -> None:
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - http.server signature
+        pass
+
+
+def make_server(service: QueryService, host: str = "127.0.0.1", port: int = 8000) -> ThreadingHTTPServer:
+    """Return a threaded HTTP server answering queries from ``service``."""
+    handler = type("Handler", (_Handler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
@@ -0,0 +1,139 @@
+"""Typed columnar snapshots of the cleaned File 1 and File 2 frames.
+
+Cleaning the raw CSVs takes seconds; reading back an uncompressed Arrow IPC
+file takes milliseconds because the file is memory-mapped and the column
+buffers are used in place. A snapshot is tied to the version of the source
+file it was built from and to ``CLEANING_VERSION``, so a new download or a
+change in the cleaning rules produces a new snapshot instead of a stale one.
+
+``pyarrow`` is only needed when snapshots are used.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Callable, Optional
+
+import pandas as pd
+
+DEFAULT_SNAPSHOT_DIR = Path(
+    os.environ.get("IRISH_CHARITIES_SNAPSHOTS", Path.home() / ".cache" / "irish_charities" / "snapshots")
+)
+
+# Bump whenever a cleaning step changes the values or dtypes it produces.
+CLEANING_VERSION = "5"
+
+_HASH_BLOCK = 1 << 20
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError("Snapshots need pyarrow: pip install pyarrow") from exc
+    return pyarrow
+
+
+def read_arrow(path: os.PathLike) -> pd.DataFrame:
+    """Memory-map an Arrow IPC file written by :func:`write_arrow`.
+
+    Numeric, date and string columns are backed by the mapped file itself
+    (each column gets its own block and was written as a single chunk), so
+    their NumPy arrays are read-only; only categorical codes are converted
+    into new buffers.
+    """
+    pa = _pyarrow()
+    with pa.memory_map(str(path), "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def write_arrow(path: os.PathLike, frame: pd.DataFrame) -> None:
+    """Atomically write ``frame``, index included, as an Arrow IPC file."""
+    pa = _pyarrow()
+    path = Path(path)
+    # One chunk per column, so read_arrow can use every buffer in place.
+    table = pa.Table.from_pandas(frame, preserve_index=True).combine_chunks()
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".partial-")
+    os.close(fd)
+    try:
+        with pa.OSFile(tmp_name, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def source_version(path: os.PathLike) -> str:
+    """Return a content hash identifying the version of a source file.
+
+    Files fetched through :class:`~irish_charities.download.DownloadCache`
+    already carry their SHA-256 in the cache metadata; anything else is hashed.
+    """
+    path = Path(path)
+    meta_path = path.with_name(path.name + ".json")
+    if meta_path.exists():
+        with open(meta_path, encoding="utf-8") as fh:
+            sha = json.load(fh).get("sha256")
+        if sha:
+            return sha
+    sha = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class SnapshotStore:
+    """Directory of Arrow IPC snapshots keyed by name and source version.
+
+    A snapshot built by code with its own version (e.g. the tokeniser of the
+    text index) passes it as ``tag``; like ``CLEANING_VERSION`` it is part
+    of the file name but not of the snapshot name, so saving a snapshot
+    removes the ones of every other source version, cleaning version and
+    tag.
+    """
+
+    def __init__(self, directory: Optional[os.PathLike] = None) -> None:
+        self.directory = Path(directory) if directory is not None else DEFAULT_SNAPSHOT_DIR
+
+    def path_for(self, name: str, version: str, tag: str = "") -> Path:
+        suffix = f"-{tag}" if tag else ""
+        return self.directory / f"{name}-{version[:16]}-c{CLEANING_VERSION}{suffix}.arrow"
+
+    def load(self, name: str, version: str, tag: str = "") -> Optional[pd.DataFrame]:
+        """Return the snapshot for ``name``/``version``, or ``None`` if absent."""
+        path = self.path_for(name, version, tag)
+        if not path.exists():
+            return None
+        return read_arrow(path)
+
+    def save(self, name: str, version: str, frame: pd.DataFrame, tag: str = "") -> Path:
+        """Write ``frame`` as the snapshot for ``name``/``version``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(name, version, tag)
+        write_arrow(path, frame)
+        for stale in self.directory.glob(f"{name}-*.arrow"):
+            if stale != path:
+                stale.unlink()
+        return path
+
+    def get_or_build(
+        self, name: str, source: os.PathLike, build: Callable[[Path], pd.DataFrame], tag: str = ""
+    ) -> pd.DataFrame:
+        """Load the snapshot of ``source``, building and saving it if needed.
+
+        ``build`` receives the source path and returns the cleaned frame.
+        """
+        version = source_version(source)
+        frame = self.load(name, version, tag)
+        if frame is None:
+            frame = build(Path(source))
+            self.save(name, version, frame, tag)
+        return frame
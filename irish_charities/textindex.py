@@ -0,0 +1,258 @@
+"""Full-text search over ``Charitable Objects`` and ``Activity Description``.
+
+Each text field gets a :class:`TextIndex`: an inverted index from stemmed
+terms to the charities whose text uses them, with the term frequencies.
+Text is normalised like names (see :func:`~irish_charities.search.normalise`),
+split into words, stripped of common English stop words and reduced with a
+light suffix stemmer, so "housing", "houses" and "housed" all meet at
+"hous". A charity is one document: its register objects, or the distinct
+activity descriptions of all its reports.
+
+Queries come in two kinds:
+
+* :meth:`TextIndex.boolean` takes terms that must all appear, ``OR``
+  between alternatives and ``-term`` (or ``NOT term``) for exclusions, e.g.
+  ``"homeless children OR youth -sport"``;
+* :meth:`TextIndex.ranked` scores every charity using any query term with
+  Okapi BM25.
+
+Both return charity numbers, which join onto the financial columns of
+``file_3`` by ``Registered Charity Number``.
+
+The index is stored as one postings frame (term, charity number, term
+frequency), which :func:`text_postings` keeps in the
+:class:`~irish_charities.snapshot.SnapshotStore` next to the cleaned data.
+:func:`~irish_charities.pipeline.load_clean` builds it with the cleaned
+snapshots, and it is rebuilt only when the source file, the cleaning or
+:data:`TOKENISER_VERSION` changes.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .columns import CHARITY_NUMBER
+from .search import normalise
+
+STOP_WORDS = frozenset(
+    """a about above after again all also am an and any are as at be been before being below between both but by
+    can could did do does doing down during each few for from further had has have having he her here hers him
+    his how i if in into is it its itself just me more most my no nor not of off on once only or other our ours
+    out over own same she should so some such than that the their theirs them then there these they this those
+    through to too under until up very was we were what when where which while who whom why will with would you
+    your yours""".split()
+)
+
+# Tried in order; the first suffix that leaves a stem of 3+ letters is removed.
+_SUFFIXES = [
+    ("ational", "ate"),
+    ("ization", "ize"),
+    ("fulness", "ful"),
+    ("ousness", "ous"),
+    ("iveness", "ive"),
+    ("ies", "y"),
+    ("sses", "ss"),
+    ("ments", ""),
+    ("ment", ""),
+    ("ings", ""),
+    ("ing", ""),
+    ("edly", ""),
+    ("ed", ""),
+    ("ly", ""),
+    ("s", ""),
+]
+_KEEP_S = ("ss", "us", "is")
+_DOUBLE = re.compile(r"([bdfgkmnprt])\1$")
+
+# Tags the postings snapshots; bump it whenever tokenise() changes.
+TOKENISER_VERSION = 1
+
+BOOLEAN_OR = "OR"
+BOOLEAN_NOT = "NOT"
+
+
+@lru_cache(maxsize=1 << 16)
+def stem(word: str) -> str:
+    """Strip one common English suffix from ``word`` (a light Porter-style stemmer).
+
+    Memoised: the vocabulary is small next to the number of words indexed.
+    """
+    if len(word) <= 3:
+        return word
+    for suffix, replacement in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) + len(replacement) >= 3:
+            if suffix == "s" and word.endswith(_KEEP_S):
+                break
+            word = word[: len(word) - len(suffix)] + replacement
+            if suffix in ("ing", "ings", "ed", "edly"):
+                word = _DOUBLE.sub(r"\1", word)
+            break
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def tokenise(text: str) -> List[str]:
+    """Normalise ``text`` and return its stemmed terms, stop words removed."""
+    return [stem(word) for word in normalise(text).split() if word not in STOP_WORDS and not word.isdigit()]
+
+
+class TextIndex:
+    """An inverted index over one text column, with charities as documents.
+
+    Parameters
+    ----------
+    postings:
+        One row per (term, charity) pair with columns ``term``,
+        ``Registered Charity Number`` and ``tf`` (the term frequency), as
+        built by :meth:`from_frame` and returned by :attr:`postings`.
+    k1, b:
+        The BM25 parameters.
+    """
+
+    def __init__(self, postings: pd.DataFrame, k1: float = 1.2, b: float = 0.75) -> None:
+        postings = postings.sort_values(["term", CHARITY_NUMBER], kind="stable").reset_index(drop=True)
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self.numbers, docs = np.unique(postings[CHARITY_NUMBER].to_numpy(dtype=np.int64), return_inverse=True)
+        self._docs = docs.astype(np.int64)
+        self._tf = postings["tf"].to_numpy(dtype=np.float64)
+        self._lengths = np.bincount(self._docs, weights=self._tf, minlength=len(self.numbers))
+        self._average_length = self._lengths.mean() if len(self._lengths) else 0.0
+        terms = postings["term"].to_numpy(dtype=object)
+        starts = np.flatnonzero(np.r_[True, terms[1:] != terms[:-1]]) if len(terms) else np.array([], dtype=int)
+        ends = np.r_[starts[1:], len(terms)]
+        self._terms = {terms[start]: (start, end) for start, end in zip(starts, ends)}
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, column: str, **bm25) -> "TextIndex":
+        """Index ``column`` of ``frame``, one document per charity number.
+
+        The distinct texts of a charity are indexed once each, so a
+        description repeated over several annual reports is not counted
+        several times.
+        """
+        texts = frame[[CHARITY_NUMBER, column]].dropna().drop_duplicates()
+        codes, uniques = pd.factorize(texts[column])
+        terms = [tokenise(str(text)) for text in uniques]
+        lengths = np.array([len(tokens) for tokens in terms], dtype=np.int64)
+        rows = np.repeat(np.arange(len(texts)), lengths[codes])
+        tokens = np.array([token for code in codes for token in terms[code]], dtype=object)
+        pairs = pd.DataFrame(
+            {"term": tokens, CHARITY_NUMBER: texts[CHARITY_NUMBER].to_numpy(dtype=np.int64)[rows]}
+        )
+        postings = pairs.groupby(["term", CHARITY_NUMBER], sort=True).size().rename("tf").reset_index()
+        postings["tf"] = postings["tf"].astype("int32")
+        return cls(postings, **bm25)
+
+    def __len__(self) -> int:
+        return len(self.numbers)
+
+    def _documents(self, term: str) -> np.ndarray:
+        start, end = self._terms.get(term, (0, 0))
+        return self._docs[start:end]
+
+    def _all_of(self, terms: Iterable[str]) -> np.ndarray:
+        docs: Optional[np.ndarray] = None
+        for term in terms:
+            found = self._documents(term)
+            docs = found if docs is None else np.intersect1d(docs, found, assume_unique=True)
+        return np.array([], dtype=np.int64) if docs is None else docs
+
+    def boolean(self, query: str) -> List[int]:
+        """Charity numbers matching ``query``.
+
+        Words are ANDed; ``OR`` separates alternatives and ``-word`` or
+        ``NOT word`` excludes charities using it.
+        """
+        matched = np.array([], dtype=np.int64)
+        excluded: List[str] = []
+        for clause in re.split(rf"\s+{BOOLEAN_OR}\s+", query.strip()):
+            required = []
+            negate = False
+            for word in clause.split():
+                if word == BOOLEAN_NOT:
+                    negate = True
+                    continue
+                if word.startswith("-") and len(word) > 1:
+                    negate, word = True, word[1:]
+                terms = tokenise(word)
+                (excluded if negate else required).extend(terms)
+                negate = False
+            if required:
+                matched = np.union1d(matched, self._all_of(required))
+        if excluded:
+            matched = np.setdiff1d(matched, np.concatenate([self._documents(term) for term in excluded]))
+        return self.numbers[matched].tolist()
+
+    def ranked(self, query: str, limit: Optional[int] = 10) -> pd.Series:
+        """BM25 scores of the best ``limit`` charities for ``query``, highest first."""
+        scores = np.zeros(len(self.numbers))
+        for term in dict.fromkeys(tokenise(query)):
+            start, end = self._terms.get(term, (0, 0))
+            if start == end:
+                continue
+            docs, tf = self._docs[start:end], self._tf[start:end]
+            idf = np.log1p((len(self.numbers) - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self._lengths[docs] / self._average_length)
+            scores[docs] += idf * tf * (self.k1 + 1) / (tf + norm)
+        hits = np.flatnonzero(scores)
+        order = hits[np.argsort(-scores[hits], kind="stable")][:limit]
+        return pd.Series(scores[order], index=pd.Index(self.numbers[order], name=CHARITY_NUMBER), name="score")
+
+
+# The indexed text fields: name -> (source file, column).
+TEXT_FIELDS = {
+    "objects": ("register", "Charitable Objects"),
+    "activities": ("annual_reports", "Activity Description"),
+}
+
+
+def text_postings(
+    file_1: pd.DataFrame,
+    file_2: pd.DataFrame,
+    sources=None,
+    period=None,
+    snapshots=None,
+) -> Dict[str, pd.DataFrame]:
+    """Build (or load from ``snapshots``) the postings of every :data:`TEXT_FIELDS` entry.
+
+    ``file_1`` and ``file_2`` are the cleaned register and reports. With
+    ``snapshots`` the postings are kept there next to the cleaned frames,
+    versioned by the matching file of ``sources`` and by
+    :data:`TOKENISER_VERSION`; the reports postings are also keyed by
+    ``period``, like the reports snapshot.
+    """
+    frames = {"register": file_1, "annual_reports": file_2}
+    postings = {}
+    for name, (source, column) in TEXT_FIELDS.items():
+        frame = frames[source]
+        if snapshots is None:
+            postings[name] = TextIndex.from_frame(frame, column).postings
+            continue
+        snapshot_name = f"text-{name}" if source == "register" else f"text-{name}_{period.key}"
+        postings[name] = snapshots.get_or_build(
+            snapshot_name,
+            getattr(sources, source),
+            lambda _, f=frame, c=column: TextIndex.from_frame(f, c).postings,
+            tag=f"t{TOKENISER_VERSION}",
+        )
+    return postings
+
+
+def text_indexes(
+    file_1: pd.DataFrame,
+    file_2: pd.DataFrame,
+    sources=None,
+    period=None,
+    snapshots=None,
+) -> Dict[str, TextIndex]:
+    """The :class:`TextIndex` of every :data:`TEXT_FIELDS` entry, from :func:`text_postings`."""
+    postings = text_postings(file_1, file_2, sources, period, snapshots)
+    return {name: TextIndex(frame) for name, frame in postings.items()}
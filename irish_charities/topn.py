@@ -0,0 +1,152 @@
+"""Top-k and bottom-k rankings of the merged frame, in one pass.
+
+A :class:`TopN` keeps, for every requested :class:`Ranking`, only the ``n``
+best rows seen so far (per group when the ranking has one). Each frame
+passed to :meth:`TopN.update` is reduced to its candidates with a linear
+partial selection, and those are merged into the kept rows, so memory stays
+bounded by ``n`` times the number of groups however many rows go through.
+
+:func:`top_n` ranks an in-memory frame; :func:`stream_top_n` reads the
+annual reports chunk by chunk, cleans and merges each chunk and feeds it to
+the engine, so the whole merged frame is never materialised.
+
+Ties keep the earlier row first and rows with a missing value are skipped,
+as with ``DataFrame.nlargest(keep="first")``.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .clean import clean_annual_reports
+from .load import DEFAULT_CHUNKSIZE, iter_annual_reports
+from .merge import add_derived_columns, concat_frames, merge
+from .period import ReportingPeriod, ReportingYears
+
+
+class Ranking(NamedTuple):
+    """The ``n`` rows with the largest ``measure`` (smallest if ``ascending``).
+
+    With ``by`` the ranking is made within each group of that column.
+    """
+
+    measure: str
+    ascending: bool = False
+    by: Optional[str] = None
+
+
+def _best(values: np.ndarray, n: int, ascending: bool) -> np.ndarray:
+    """Return the positions of the ``n`` best values, best first."""
+    keys = values.astype("float64")
+    if not ascending:
+        keys = -keys
+    candidates = np.flatnonzero(~np.isnan(keys))
+    if len(candidates) > n:
+        # Everything tied with the n-th value is a candidate, so the stable
+        # sort below can still prefer the earliest rows.
+        kth = np.partition(keys[candidates], n - 1)[n - 1]
+        candidates = candidates[keys[candidates] <= kth]
+    return candidates[np.argsort(keys[candidates], kind="stable")][:n]
+
+
+def _best_by_group(values: np.ndarray, groups: pd.Series, n: int, ascending: bool) -> np.ndarray:
+    """Return the positions of the ``n`` best values of each group.
+
+    The positions are ordered by group, then best first.
+    """
+    keys = values.astype("float64")
+    if not ascending:
+        keys = -keys
+    codes, _ = pd.factorize(groups, sort=True, use_na_sentinel=False)
+    valid = np.flatnonzero(~np.isnan(keys))
+    order = valid[np.lexsort((keys[valid], codes[valid]))]
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+    rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+    return order[rank < n]
+
+
+class TopN:
+    """Accumulate several rankings over one or more frames.
+
+    Parameters
+    ----------
+    rankings:
+        The rankings to compute.
+    n:
+        How many rows each ranking (or each group of it) keeps.
+    columns:
+        Columns kept for the ranked rows, in addition to the measures and
+        groups of the rankings. Defaults to every column.
+    """
+
+    def __init__(self, rankings: Iterable[Ranking], n: int = 5, columns: Optional[List[str]] = None) -> None:
+        self.rankings = list(dict.fromkeys(rankings))
+        self.n = n
+        self.columns = columns
+        self._kept: Dict[Ranking, pd.DataFrame] = {}
+
+    def _select(self, frame: pd.DataFrame, ranking: Ranking) -> pd.DataFrame:
+        values = frame[ranking.measure].to_numpy(dtype="float64", na_value=np.nan)
+        if ranking.by is None:
+            positions = _best(values, self.n, ranking.ascending)
+        else:
+            positions = _best_by_group(values, frame[ranking.by], self.n, ranking.ascending)
+        return frame.take(positions)
+
+    def update(self, frame: pd.DataFrame) -> None:
+        """Merge the rows of ``frame`` into every ranking.
+
+        Rows of later frames count as coming after those of earlier ones.
+        """
+        if self.columns is not None:
+            needed = [column for ranking in self.rankings for column in (ranking.measure, ranking.by) if column]
+            frame = frame[list(dict.fromkeys(self.columns + needed))]
+        for ranking in self.rankings:
+            candidates = self._select(frame, ranking)
+            if ranking in self._kept:
+                candidates = self._select(concat_frames([self._kept[ranking], candidates]), ranking)
+            self._kept[ranking] = candidates
+
+    def result(self) -> Dict[Ranking, pd.DataFrame]:
+        """Return the kept rows of every ranking, keyed by ranking."""
+        return {ranking: self._kept.get(ranking) for ranking in self.rankings}
+
+
+def top_n(
+    file_3: pd.DataFrame, rankings: Iterable[Ranking], n: int = 5, columns: Optional[List[str]] = None
+) -> Dict[Ranking, pd.DataFrame]:
+    """Compute every ranking over the in-memory ``file_3``."""
+    engine = TopN(rankings, n, columns)
+    engine.update(file_3)
+    return engine.result()
+
+
+def stream_top_n(
+    file_1: pd.DataFrame,
+    reports_path: os.PathLike,
+    rankings: Iterable[Ranking],
+    period: Optional[Union[ReportingPeriod, ReportingYears]] = None,
+    n: int = 5,
+    columns: Optional[List[str]] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> Dict[Ranking, pd.DataFrame]:
+    """Compute every ranking straight from the annual-reports file.
+
+    Each chunk of reports is cleaned, merged with the cleaned register
+    ``file_1`` and ranked before the next one is read. The kept rows are
+    indexed by their position among the reports of ``period``, as in the
+    fully merged frame.
+    """
+    engine = TopN(rankings, n, columns)
+    offset = 0
+    for raw_2 in iter_annual_reports(reports_path, period, chunksize):
+        chunk = add_derived_columns(merge(file_1, clean_annual_reports(raw_2, inplace=True)))
+        chunk.index += offset
+        offset += len(chunk)
+        engine.update(chunk)
+    return engine.result()
@@ -0,0 +1,51 @@
+"""Shared fixtures: the small CSVs in ``tests/data``.
+
+They were written by ``benchmarks/synthetic.py`` (40 charities, 2018-2022),
+so they have the layout of the real downloads: banner row, multi-line
+headers, quoted fields holding newlines and ``""`` escapes, and padding rows
+after the register. ``charity-annual-reports-next.csv`` is the same file a
+refresh later: three reports withdrawn, three restated, five newly filed and
+one filed twice for the same period.
+"""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from irish_charities.clean import clean_register
+from irish_charities.download import ANNUAL_REPORTS_URL, REGISTER_URL, DownloadCache
+from irish_charities.load import read_register
+
+DATA = Path(__file__).parent / "data"
+
+
+@pytest.fixture
+def register_path() -> Path:
+    return DATA / "register-of-charities.csv"
+
+
+@pytest.fixture
+def reports_path() -> Path:
+    return DATA / "charity-annual-reports.csv"
+
+
+@pytest.fixture
+def next_reports_path() -> Path:
+    return DATA / "charity-annual-reports-next.csv"
+
+
+@pytest.fixture
+def file_1(register_path):
+    return clean_register(read_register(register_path))
+
+
+@pytest.fixture
+def offline_cache(tmp_path, register_path, reports_path):
+    """A download cache holding the fixtures, in offline mode."""
+    cache = DownloadCache(tmp_path / "downloads", offline=True)
+    cache.directory.mkdir()
+    for url, path in [(REGISTER_URL, register_path), (ANNUAL_REPORTS_URL, reports_path)]:
+        shutil.copyfile(path, cache.path_for(url))
+        cache._write_meta(url, {"url": url, "fetched_at": "2022-12-04T00:00:00Z"})
+    return cache
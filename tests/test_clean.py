@@ -0,0 +1,55 @@
+"""Cleaning of the annual-reports frame."""
+
+import pandas as pd
+import pytest
+
+from irish_charities.clean import clean_annual_reports
+from irish_charities.columns import REPORTING_YEAR
+
+RAW_HEADER = [
+    "Registered\nCharity\nNumber",
+    "Registered Charity Name",
+    "Period\nStart Date",
+    "Period\nEnd Date",
+    "Report Activity",
+    "Activity Description",
+    "Beneficiaries",
+    "Financial: Income from Central Government or Local Authorities",
+    "Financial: Income from other public bodies",
+    "Financial: Income from philantrophic organisations",
+    "Financial: Income from donations",
+    "Financial: Income from bequests",
+    "Financial: Income from trading and commercial activities",
+    "Financial: Income from other sources",
+    "Financial: Gross Income",
+    "Financial: Gross Expenditure",
+]
+
+
+def _raw_reports(periods):
+    rows = [
+        [20000000 + i, f"Charity {i}", start, end, "Other", "Helping", "Children"] + ["\x80100"] * 9
+        for i, (start, end) in enumerate(periods)
+    ]
+    raw = pd.DataFrame(rows, columns=RAW_HEADER)
+    raw[RAW_HEADER[0]] = raw[RAW_HEADER[0]].astype("Int64")
+    return raw.astype({"Report Activity": "category"})
+
+
+def test_reports_without_an_end_date_are_dropped():
+    raw = _raw_reports([("01/01/2021", "31/12/2021"), ("01/01/2021", None), ("01/07/2020", "30/06/2021")])
+    with pytest.warns(UserWarning, match=r"1 annual reports have no valid period end date.*20000001"):
+        file_2 = clean_annual_reports(raw)
+    assert file_2["Registered Charity Number"].tolist() == [20000000, 20000002]
+    assert file_2[REPORTING_YEAR].dtype == "int16"
+    assert file_2[REPORTING_YEAR].tolist() == [2021, 2021]
+
+
+def test_reports_with_a_malformed_end_date_are_dropped():
+    raw = _raw_reports([("01/01/2021", "31/12/2021"), ("01/01/2021", "31/13/2021")])
+    with pytest.warns(UserWarning) as record:
+        file_2 = clean_annual_reports(raw)
+    messages = [str(warning.message) for warning in record]
+    assert any("'31/13/2021' (1 rows)" in message for message in messages)
+    assert any("1 annual reports have no valid period end date" in message for message in messages)
+    assert file_2["Registered Charity Number"].tolist() == [20000000]
@@ -0,0 +1,46 @@
+"""The aggregate cube against group-bys of the merged frame."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irish_charities.analyse import q8_top_beneficiaries
+from irish_charities.clean import clean_annual_reports
+from irish_charities.cube import COUNT, CUBE_MEASURES, AggregateCube, count_of
+from irish_charities.load import read_annual_reports
+from irish_charities.merge import LEAD_BENEFICIARY, add_derived_columns, merge
+
+
+@pytest.fixture
+def file_3(file_1, reports_path):
+    file_3 = add_derived_columns(merge(file_1, clean_annual_reports(read_annual_reports(reports_path))))
+    # Malformed amounts are left missing by the cleaning.
+    file_3.loc[file_3.index[::7], "Total Gross Expenditure"] = np.nan
+    file_3.loc[file_3.index[::11], "Income: Donations"] = np.nan
+    return file_3
+
+
+@pytest.mark.parametrize("by", [["Governing Form"], ["Reporting Year", LEAD_BENEFICIARY]])
+def test_rollup_equals_groupby(file_3, by):
+    rolled = AggregateCube.from_frame(file_3).rollup(by)
+    grouped = file_3.groupby(by, observed=True)[CUBE_MEASURES]
+    pd.testing.assert_frame_equal(rolled[CUBE_MEASURES], grouped.sum(), check_exact=False)
+    counts = rolled[[count_of(measure) for measure in CUBE_MEASURES]]
+    pd.testing.assert_frame_equal(counts, grouped.count().rename(columns=count_of))
+    pd.testing.assert_series_equal(rolled[COUNT], grouped.size(), check_names=False)
+
+
+def test_total_counts_leave_out_missing_amounts(file_3):
+    total = AggregateCube.from_frame(file_3).rollup()
+    assert total.loc["total", COUNT] == len(file_3)
+    assert total.loc["total", count_of("Total Gross Expenditure")] == file_3["Total Gross Expenditure"].count()
+    assert total.loc["total", count_of("Total Gross Expenditure")] < len(file_3)
+
+
+def test_q8_counts_as_the_notebook(file_3):
+    expected = (
+        file_3.groupby([LEAD_BENEFICIARY], observed=True)
+        .agg({"Total Gross Expenditure": "count"})
+        .nlargest(n=5, columns=["Total Gross Expenditure"])
+    )
+    pd.testing.assert_frame_equal(q8_top_beneficiaries(AggregateCube.from_frame(file_3))["count"], expected)
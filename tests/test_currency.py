@@ -0,0 +1,26 @@
+"""Parsing the euro amounts of the annual reports."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irish_charities.currency import parse_currency, parse_currency_columns
+
+
+@pytest.mark.parametrize("dtype", ["str", object])
+def test_fill_value_only_replaces_blank_amounts(dtype):
+    frame = pd.DataFrame(
+        {
+            "a": pd.Series(["\x801,000", None, "1.2.3", "(50)"], dtype=dtype),
+            "b": pd.Series(["â\x82¬2", "", "\x80", "3"], dtype=dtype),
+        }
+    )
+    with pytest.warns(UserWarning, match=r"1 amounts could not be parsed and were set to NaN"):
+        parse_currency_columns(frame, ["a", "b"], fill_value=0)
+    np.testing.assert_array_equal(frame["a"], [1000.0, 0.0, np.nan, -50.0])
+    np.testing.assert_array_equal(frame["b"], [2.0, 0.0, 0.0, 3.0])
+
+
+def test_parse_currency_keeps_missing_amounts():
+    parsed = parse_currency(pd.Series(["\x8012.50", None], index=[7, 7], dtype=object))
+    np.testing.assert_array_equal(parsed, [12.5, np.nan])
@@ -0,0 +1,42 @@
+"""Parsing the period dates of the annual reports."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irish_charities.dates import parse_date_columns, parse_dates
+
+
+def test_each_distinct_date_is_spread_back_to_its_rows():
+    values = pd.Series(["31/12/2021", "01/01/2021", "31/12/2021", "1/7/2020", "31/12/2021"], index=[5, 3, 9, 1, 2])
+    parsed = parse_dates(values)
+    expected = pd.to_datetime(values, format="%d/%m/%Y")
+    pd.testing.assert_series_equal(parsed, expected, check_dtype=False)
+    assert parsed.index.tolist() == [5, 3, 9, 1, 2]
+
+
+def test_missing_and_blank_dates_stay_nat_without_a_warning(recwarn):
+    parsed = parse_dates(pd.Series(["31/12/2021", None, np.nan, "", "  "], dtype=object))
+    assert parsed.isna().tolist() == [False, True, True, True, True]
+    assert not recwarn.list
+
+
+def test_date_columns_share_one_parse():
+    frame = pd.DataFrame({"start": ["01/01/2021", None], "end": ["31/12/2021", "01/01/2021"]})
+    parse_date_columns(frame, ["start", "end"])
+    assert frame["start"].tolist()[0] == pd.Timestamp(2021, 1, 1)
+    assert pd.isna(frame["start"].iloc[1])
+    assert frame["end"].tolist() == [pd.Timestamp(2021, 12, 31), pd.Timestamp(2021, 1, 1)]
+
+
+def test_malformed_dates_are_reported_and_set_to_nat():
+    values = pd.Series(["31/12/2021", "31/02/2021", "2021-12-31", "31/02/2021"])
+    match = r"2 distinct dates .* set to NaT: '31/02/2021' \(2 rows\), '2021-12-31' \(1 rows\)"
+    with pytest.warns(UserWarning, match=match):
+        parsed = parse_dates(values)
+    assert parsed.isna().tolist() == [False, True, True, True]
+
+
+def test_strict_parsing_raises_on_malformed_dates():
+    with pytest.raises(ValueError, match=r"1 distinct dates do not match '%d/%m/%Y': '31/02/2021' \(1 rows\)"):
+        parse_dates(pd.Series(["31/12/2021", "31/02/2021"]), strict=True)
@@ -0,0 +1,103 @@
+"""DownloadCache against a local HTTP stand-in for the regulator's server."""
+
+import threading
+import urllib.error
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from irish_charities.download import DownloadCache
+
+
+class _Regulator(BaseHTTPRequestHandler):
+    body = b"a,b\n1,2\n"
+    etag = '"v1"'
+    status = 200
+    requests = []
+
+    def do_GET(self):  # noqa: N802 - http.server naming
+        type(self).requests.append(dict(self.headers))
+        if self.status != 200:
+            self.send_error(self.status)
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", self.etag)
+        self.send_header("Content-Length", str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, format, *args):  # noqa: A002 - http.server signature
+        pass
+
+
+@pytest.fixture
+def regulator():
+    handler = type("Regulator", (_Regulator,), {"requests": []})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield handler, f"http://127.0.0.1:{server.server_port}/register-of-charities.csv"
+    server.shutdown()
+    server.server_close()
+
+
+def test_revalidates_with_etag(regulator, tmp_path):
+    handler, url = regulator
+    cache = DownloadCache(tmp_path)
+
+    path = cache.fetch(url)
+    assert path.read_bytes() == b"a,b\n1,2\n"
+    assert cache.metadata(url)["etag"] == '"v1"'
+
+    assert cache.fetch(url) == path
+    assert handler.requests[-1]["If-None-Match"] == '"v1"'
+    assert path.read_bytes() == b"a,b\n1,2\n"
+
+    handler.body, handler.etag = b"a,b\n3,4\n", '"v2"'
+    assert cache.fetch(url).read_bytes() == b"a,b\n3,4\n"
+    assert cache.metadata(url)["etag"] == '"v2"'
+    assert len(handler.requests) == 3
+
+
+def test_offline_uses_cached_copy_only(regulator, tmp_path):
+    handler, url = regulator
+    with pytest.raises(FileNotFoundError):
+        DownloadCache(tmp_path, offline=True).fetch(url)
+    DownloadCache(tmp_path).fetch(url)
+    seen = len(handler.requests)
+
+    path = DownloadCache(tmp_path, offline=True).fetch(url)
+    assert path.read_bytes() == b"a,b\n1,2\n"
+    assert len(handler.requests) == seen
+
+
+def test_server_error_falls_back_to_cached_copy(regulator, tmp_path):
+    handler, url = regulator
+    cache = DownloadCache(tmp_path)
+    cache.fetch(url)
+
+    handler.status = 503
+    with pytest.warns(UserWarning, match="using cached copy"):
+        path = cache.fetch(url)
+    assert path.read_bytes() == b"a,b\n1,2\n"
+
+
+def test_server_error_without_cached_copy_raises(regulator, tmp_path):
+    handler, url = regulator
+    handler.status = 503
+    with pytest.raises(urllib.error.HTTPError):
+        DownloadCache(tmp_path).fetch(url)
+
+
+def test_client_error_is_raised_even_when_cached(regulator, tmp_path):
+    handler, url = regulator
+    cache = DownloadCache(tmp_path)
+    cache.fetch(url)
+
+    handler.status = 404
+    with pytest.raises(urllib.error.HTTPError):
+        cache.fetch(url)
@@ -0,0 +1,69 @@
+"""The financial block: exact totals, quantiles and boxplot statistics."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irish_charities.analyse import q1_total_gross_income
+from irish_charities.financials import FinancialBlock
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(3)
+    income = rng.lognormal(10, 2, 1001).round(2)
+    expenditure = rng.lognormal(9, 1, 1001).round(2)
+    income[[5, 40, 700]] = np.nan
+    return pd.DataFrame(
+        {
+            "Total Gross Income": income,
+            "Total Gross Expenditure": expenditure,
+            "Reporting Year": np.where(np.arange(1001) % 3 == 0, 2020, 2021),
+        }
+    )
+
+
+def test_totals_add_cents_and_skip_missing():
+    frame = pd.DataFrame({"Total Gross Income": [0.1] * 10 + [np.nan, 1234567.89]})
+    block = FinancialBlock.from_frame(frame, ["Total Gross Income"])
+    assert block.totals()["Total Gross Income"] == 1234568.89
+    assert q1_total_gross_income(frame) == q1_total_gross_income(block) == 1234568.89
+    assert np.isnan(block.column("Total Gross Income").iloc[10])
+
+
+def test_grouped_totals_leave_out_rows_without_a_group():
+    frame = pd.DataFrame(
+        {"Total Gross Income": [1.5, 2.25, 3.0, 4.75, 8.0], "Reporting Year": [2021, 2020, 2021, 2020, None]}
+    )
+    block = FinancialBlock.from_frame(frame, ["Total Gross Income"], by="Reporting Year")
+    totals = block.totals(grouped=True)["Total Gross Income"]
+    assert totals.index.name == "Reporting Year"
+    assert totals.to_dict() == {2020.0: 7.0, 2021.0: 4.5}
+
+
+def test_quantiles_match_numpy(frame):
+    block = FinancialBlock.from_frame(frame, ["Total Gross Income", "Total Gross Expenditure"], storage="float64")
+    quantiles = block.quantiles([0.25, 0.5, 0.75])
+    for column in block.columns:
+        np.testing.assert_allclose(quantiles[column], np.nanquantile(frame[column], [0.25, 0.5, 0.75]))
+
+
+@pytest.mark.parametrize("storage", ["cents", "float64"])
+def test_box_stats_match_matplotlib(frame, storage):
+    cbook = pytest.importorskip("matplotlib.cbook")
+    block = FinancialBlock.from_frame(frame, ["Total Gross Income", "Total Gross Expenditure"], storage=storage)
+    for ours in block.box_stats():
+        # Missing amounts are left out, as the notebook's boxplots do.
+        values = frame[ours["label"]].dropna().to_numpy()
+        theirs = cbook.boxplot_stats(values, labels=[ours["label"]])[0]
+        for key in ["mean", "med", "q1", "q3", "iqr", "whislo", "whishi"]:
+            assert ours[key] == pytest.approx(theirs[key]), key
+        np.testing.assert_allclose(np.sort(ours["fliers"]), np.sort(theirs["fliers"]))
+
+
+def test_box_stats_of_selected_columns():
+    frame = pd.DataFrame({"a": [1.0, np.nan, 3.0], "b": [np.nan] * 3})
+    stats = FinancialBlock.from_frame(frame, ["a", "b"]).box_stats(["a"])
+    assert [entry["label"] for entry in stats] == ["a"]
+    assert stats[0]["med"] == 2.0
+    assert FinancialBlock.from_frame(frame, ["a", "b"]).quantiles([0.5])["b"].isna().all()
@@ -0,0 +1,139 @@
+"""Incremental refresh against a full recompute of the same reports file."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from irish_charities import incremental, parallel
+from irish_charities.clean import clean_annual_reports
+from irish_charities.incremental import IncrementalState, aggregate, in_euros, report_keys
+from irish_charities.load import read_annual_reports
+from irish_charities.merge import add_derived_columns, merge
+from irish_charities.period import ReportingYears
+from irish_charities.snapshot import read_arrow, write_arrow
+
+pytest.importorskip("pyarrow")
+
+PERIOD = ReportingYears(2018, 2022)
+
+
+def _recompute(file_1, reports_path):
+    raw_2 = read_annual_reports(reports_path, period=PERIOD)
+    raw_2.index = pd.Index(report_keys(raw_2), dtype="uint64")
+    file_3 = add_derived_columns(merge(file_1, clean_annual_reports(raw_2), keep_index=True))
+    return file_3, aggregate(file_3)
+
+
+def _assert_matches(result, file_1, reports_path, state_dir=None):
+    file_3, aggregates = _recompute(file_1, reports_path)
+    pd.testing.assert_frame_equal(result.file_3.sort_index(), file_3.sort_index())
+    for name, frame in aggregates.items():
+        pd.testing.assert_frame_equal(result.aggregates[name], in_euros(frame))
+    if state_dir is not None:
+        # The stored sums are int64 cents, equal to the recomputed ones to the cent.
+        generation = json.loads((state_dir / "state.json").read_text())["generation"]
+        for name, frame in aggregates.items():
+            stored = read_arrow(state_dir / f"aggregates_{name}-{generation}.arrow")
+            assert (stored.dtypes == "int64").all()
+            pd.testing.assert_frame_equal(stored, frame, check_exact=True)
+
+
+def _append_rows(reports_path, path, rows=3):
+    """Write the reports file to ``path`` with copies of its first ``rows`` data rows appended.
+
+    The copies are second filings for the same charities and periods.
+    """
+    data = reports_path.read_bytes()
+    header, _ = parallel.byte_ranges(reports_path, 1)
+    with open(reports_path, "rb") as fh:
+        end = len(header)
+        for _ in range(rows):
+            end = parallel._row_end(fh, end, end)
+    path.write_bytes(data + data[len(header) : end])
+
+
+def test_refresh_equals_full_recompute(tmp_path, file_1, reports_path, next_reports_path):
+    state = IncrementalState(tmp_path, PERIOD)
+    first = state.refresh(file_1, "register-v1", reports_path)
+    assert first.full_rebuild
+    _assert_matches(first, file_1, reports_path)
+
+    second = state.refresh(file_1, "register-v1", next_reports_path)
+    assert not second.full_rebuild and not second.appended_only
+    assert (second.added, second.changed, second.removed) == (6, 3, 3)
+    _assert_matches(second, file_1, next_reports_path, tmp_path)
+
+
+def test_only_appended_rows_are_parsed(tmp_path, monkeypatch, file_1, reports_path):
+    state_dir = tmp_path / "state"
+    state = IncrementalState(state_dir, PERIOD)
+    path = tmp_path / "charity-annual-reports.csv"
+    path.write_bytes(reports_path.read_bytes())
+    state.refresh(file_1, "register-v1", path)
+
+    _append_rows(reports_path, path)
+
+    def full_parse(*args, **kwargs):
+        raise AssertionError("only the appended rows should have been parsed")
+
+    monkeypatch.setattr(incremental, "read_annual_reports", full_parse)
+    result = state.refresh(file_1, "register-v1", path)
+    monkeypatch.undo()
+    assert result.appended_only
+    assert (result.added, result.changed, result.removed) == (3, 0, 0)
+    _assert_matches(result, file_1, path, state_dir)
+
+    unchanged = state.refresh(file_1, "register-v1", path)
+    assert unchanged.appended_only
+    assert (unchanged.added, unchanged.changed, unchanged.removed) == (0, 0, 0)
+    _assert_matches(unchanged, file_1, path, state_dir)
+
+
+def test_changed_prefix_falls_back_to_a_full_rehash(tmp_path, file_1, reports_path, next_reports_path):
+    path = tmp_path / "charity-annual-reports.csv"
+    _append_rows(reports_path, path)
+    state = IncrementalState(tmp_path / "state", PERIOD)
+    state.refresh(file_1, "register-v1", reports_path)
+    result = state.refresh(file_1, "register-v1", path)
+    assert result.appended_only
+    # Rows were restated and withdrawn, including the three appended ones.
+    result = state.refresh(file_1, "register-v1", next_reports_path)
+    assert not result.appended_only
+    assert (result.added, result.changed, result.removed) == (6, 3, 6)
+    _assert_matches(result, file_1, next_reports_path, tmp_path / "state")
+
+
+def test_new_register_version_rejoins_stored_reports(tmp_path, file_1, reports_path, next_reports_path):
+    state = IncrementalState(tmp_path, PERIOD)
+    state.refresh(file_1, "register-v1", reports_path)
+    renamed = file_1.assign(**{"Registered Charity Name": file_1["Registered Charity Name"] + " CLG"})
+    result = state.refresh(renamed, "register-v2", next_reports_path)
+    assert not result.full_rebuild
+    _assert_matches(result, renamed, next_reports_path)
+
+
+def test_interrupted_refresh_keeps_the_previous_state(tmp_path, monkeypatch, file_1, reports_path, next_reports_path):
+    state = IncrementalState(tmp_path, PERIOD)
+    state.refresh(file_1, "register-v1", reports_path)
+    written = []
+
+    def write_then_fail(path, frame):
+        if "file_3" in path.name:
+            raise KeyboardInterrupt
+        written.append(path.name)
+        write_arrow(path, frame)
+
+    monkeypatch.setattr(incremental, "write_arrow", write_then_fail)
+    with pytest.raises(KeyboardInterrupt):
+        state.refresh(file_1, "register-v1", next_reports_path)
+    assert written == ["watermark-2.arrow", "reports-2.arrow"]
+    monkeypatch.undo()
+
+    result = state.refresh(file_1, "register-v1", next_reports_path)
+    assert not result.full_rebuild
+    assert (result.added, result.changed, result.removed) == (6, 3, 3)
+    _assert_matches(result, file_1, next_reports_path)
+    assert sorted(path.name for path in tmp_path.glob("*.arrow")) == sorted(
+        f"{name}-2.arrow" for name in incremental.STATE_FILES
+    )
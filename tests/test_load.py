@@ -0,0 +1,20 @@
+"""Reading the raw CSV files."""
+
+from irish_charities.load import read_register
+
+LAST_ROW = (
+    b"20000039,Charity 20000039,Registered,,\"54 Main Street, Co. Cork, Ireland\",Trust,,Ireland,"
+    b"Relief of poverty or economic hardship,Helping people  ,\r\n"
+)
+
+
+def test_register_padding_is_skipped_but_the_last_row_is_kept_whole(register_path, tmp_path):
+    data = register_path.read_bytes()
+    last_row = data.rindex(b"\n20000039,") + 1
+    padding = data.index(b"\r\n,,,,,,,,,,\r\n", last_row) + 2
+    path = tmp_path / "register.csv"
+    path.write_bytes(data[:last_row] + LAST_ROW + data[padding:])
+    register = read_register(path)
+    assert len(register) == 40
+    assert register["Charitable Objects"].iloc[-1] == "Helping people  "
+    assert register["Governing Form"].iloc[-1] == "Trust"
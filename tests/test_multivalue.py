@@ -0,0 +1,93 @@
+"""The multi-valued Beneficiaries and Charitable Purpose fields."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irish_charities.analyse import q8_top_beneficiaries
+from irish_charities.cube import CUBE_DIMENSIONS, CUBE_MEASURES
+from irish_charities.merge import LEAD_BENEFICIARY, first_item
+from irish_charities.multivalue import MultiValued, funds_by_category
+
+
+@pytest.fixture
+def file_3():
+    return pd.DataFrame(
+        {
+            "Beneficiaries": [
+                "Children; Carers",
+                "Carers",
+                None,
+                "",
+                "Children; Older people; Carers",
+                "Children; Carers",
+                "Older people; Older people",
+            ],
+            "Total Gross Expenditure": [100.0, 30.0, 7.0, 5.0, 90.0, np.nan, 40.0],
+            "Reporting Year": [2021, 2021, 2021, 2022, 2022, 2022, 2022],
+        },
+        index=[10, 11, 12, 13, 14, 15, 16],
+    )
+
+
+def test_incidence_matrix(file_3):
+    matrix = MultiValued.from_series(file_3["Beneficiaries"])
+    assert matrix.shape == (7, 3)
+    assert matrix.categories.tolist() == ["Carers", "Children", "Older people"]
+    # Missing and empty cells list nothing; a repeated label is listed once.
+    assert matrix.lengths().tolist() == [2, 1, 0, 0, 3, 2, 1]
+    assert matrix.counts().tolist() == [4, 3, 2]
+
+
+def test_first_entry_equals_first_item(file_3):
+    listed = file_3["Beneficiaries"].where(file_3["Beneficiaries"] != "")
+    first = MultiValued.from_series(listed).first()
+    pd.testing.assert_series_equal(first, first_item(listed).reset_index(drop=True), check_categorical=False)
+
+
+def test_explode_equals_pandas_explode(file_3):
+    listed = file_3["Beneficiaries"].iloc[[0, 1, 2, 4, 5]]
+    exploded = MultiValued.from_series(listed).explode(listed.index)
+    expected = listed.str.split(";").explode().str.strip().dropna()
+    pd.testing.assert_series_equal(exploded.astype(object), expected.astype(object))
+
+
+def test_every_listed_category_gets_the_full_amount(file_3):
+    funds = funds_by_category(file_3, "Beneficiaries")
+    assert funds.to_dict("index") == {
+        "Children": {"count": 2, "Total Gross Expenditure": 190.0},
+        "Carers": {"count": 3, "Total Gross Expenditure": 220.0},
+        "Older people": {"count": 2, "Total Gross Expenditure": 130.0},
+    }
+
+
+def test_split_amounts_add_up_to_the_listed_total(file_3):
+    funds = funds_by_category(file_3, "Beneficiaries", split=True)
+    assert funds["Total Gross Expenditure"].to_dict() == pytest.approx(
+        {"Carers": 50 + 30 + 30, "Children": 50 + 30, "Older people": 30 + 40}
+    )
+    listed = MultiValued.from_series(file_3["Beneficiaries"]).lengths() > 0
+    assert funds["Total Gross Expenditure"].sum() == pytest.approx(file_3.loc[listed, "Total Gross Expenditure"].sum())
+
+
+def test_funds_by_year(file_3):
+    funds = funds_by_category(file_3, "Beneficiaries", split=True, by="Reporting Year")
+    assert funds.index.names == ["Reporting Year", "Beneficiaries"]
+    assert funds.loc[2022, "Total Gross Expenditure"].to_dict() == pytest.approx(
+        {"Carers": 30.0, "Children": 30.0, "Older people": 70.0}
+    )
+    assert funds.loc[(2021, "Carers"), "count"] == 2
+
+
+def test_q8_credits_every_listed_beneficiary(file_3):
+    file_3 = file_3.assign(
+        **{column: 0.0 for column in CUBE_MEASURES if column != "Total Gross Expenditure"},
+        **{column: "x" for column in CUBE_DIMENSIONS if column not in file_3},
+    )
+    file_3[LEAD_BENEFICIARY] = first_item(file_3["Beneficiaries"])
+    parts = q8_top_beneficiaries(file_3)
+    pd.testing.assert_frame_equal(parts["all_listed"], funds_by_category(file_3, "Beneficiaries"))
+    pd.testing.assert_frame_equal(parts["all_listed_split"], funds_by_category(file_3, "Beneficiaries", split=True))
+    # The lead beneficiary parts still only use the first entry, as the notebook does.
+    lead = parts["count"]["Total Gross Expenditure"].to_dict()
+    assert lead == {"Children": 2, "Carers": 1, "Older people": 1, "": 1}
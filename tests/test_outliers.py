@@ -0,0 +1,99 @@
+"""IQR fences, outlier flags and winsorisation."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irish_charities.outliers import FENCE_COLUMNS, flag_outliers, iqr_fences, outlier_sets, winsorise
+
+COLUMNS = ["Total Gross Income", "Total Gross Expenditure"]
+
+
+@pytest.fixture
+def frame():
+    rng = np.random.default_rng(7)
+    income = rng.lognormal(10, 2, 200).round(2)
+    expenditure = rng.lognormal(9, 1, 200).round(2)
+    income[[3, 50]] = np.nan
+    return pd.DataFrame(
+        {
+            "Total Gross Income": income,
+            "Total Gross Expenditure": expenditure,
+            "Governing Form": np.where(np.arange(200) % 3 == 0, "Trust", "Company"),
+            "Status": "Registered",
+        },
+        index=np.arange(200) * 2 + 1,
+    )
+
+
+def _expected_fences(values, k=1.5):
+    q1, q3 = np.nanpercentile(values, [25, 75])
+    iqr = q3 - q1
+    return [q1, q3, iqr, q1 - k * iqr, q3 + k * iqr]
+
+
+def test_fences_match_numpy_percentiles(frame):
+    fences = iqr_fences(frame, COLUMNS)
+    assert fences.columns.tolist() == FENCE_COLUMNS
+    for column in COLUMNS:
+        np.testing.assert_allclose(fences.loc[column], _expected_fences(frame[column].to_numpy()))
+
+
+def test_grouped_fences_match_numpy_percentiles(frame):
+    fences = iqr_fences(frame, COLUMNS, by="Governing Form", k=3)
+    assert fences.index.names == ["Governing Form", "measure"]
+    for (form, column), row in fences.iterrows():
+        values = frame.loc[frame["Governing Form"] == form, column].to_numpy()
+        np.testing.assert_allclose(row, _expected_fences(values, k=3))
+
+
+def test_flags_and_sets_mark_values_outside_the_fences(frame):
+    fences = iqr_fences(frame, COLUMNS)
+    flags = flag_outliers(frame, COLUMNS, fences=fences)
+    sets = outlier_sets(frame, COLUMNS, fences=fences)
+    for column in COLUMNS:
+        low, high = fences.loc[column, ["lower_limit", "upper_limit"]]
+        expected = (frame[column] < low) | (frame[column] > high)
+        pd.testing.assert_series_equal(flags[column], expected)
+        pd.testing.assert_index_equal(sets[column], frame.index[expected.to_numpy()])
+    assert not flags.loc[[7, 101], "Total Gross Income"].any()
+    assert len(sets["Total Gross Income"])
+
+
+def test_all_missing_group_has_no_fences_and_no_outliers(frame):
+    frame.loc[frame["Governing Form"] == "Trust", "Total Gross Income"] = np.nan
+    frame.loc[frame.index[:5], "Governing Form"] = None
+    fences = iqr_fences(frame, COLUMNS, by="Governing Form")
+    assert fences.loc[("Trust", "Total Gross Income")].isna().all()
+    flags = flag_outliers(frame, COLUMNS, by="Governing Form", fences=fences)
+    assert not flags.loc[frame["Governing Form"] == "Trust", "Total Gross Income"].any()
+    # Rows without a group are never flagged.
+    assert not flags.loc[frame.index[:5]].to_numpy().any()
+    assert flags["Total Gross Expenditure"].any()
+
+
+@pytest.mark.parametrize("by", [None, "Governing Form"])
+def test_winsorise_caps_at_the_fences(frame, by):
+    fences = iqr_fences(frame, COLUMNS, by=by)
+    flags = flag_outliers(frame, COLUMNS, by=by, fences=fences)
+    capped = winsorise(frame, COLUMNS, by=by, fences=fences, inplace=False)
+    assert capped.columns.tolist() == COLUMNS
+    for column in COLUMNS:
+        if by is None:
+            expected = frame[column].clip(*fences.loc[column, ["lower_limit", "upper_limit"]])
+        else:
+            limits = fences.xs(column, level="measure").reindex(frame[by])
+            expected = frame[column].clip(limits["lower_limit"].to_numpy(), limits["upper_limit"].to_numpy())
+        pd.testing.assert_series_equal(capped[column], expected)
+        # Only the flagged values change; missing amounts stay missing.
+        changed = capped[column].ne(frame[column]) & frame[column].notna()
+        pd.testing.assert_series_equal(changed, flags[column], check_names=False)
+        assert capped[column].isna().equals(frame[column].isna())
+
+
+def test_winsorise_in_place_only_replaces_the_measures(frame):
+    original = frame.copy()
+    assert winsorise(frame, COLUMNS) is frame
+    pd.testing.assert_frame_equal(frame[COLUMNS], winsorise(original, COLUMNS, inplace=False))
+    pd.testing.assert_frame_equal(frame.drop(columns=COLUMNS), original.drop(columns=COLUMNS))
+    assert frame["Total Gross Income"].max() < original["Total Gross Income"].max()
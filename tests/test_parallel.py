@@ -0,0 +1,81 @@
+"""Cutting the reports file into row-aligned byte ranges, and cleaning them in parallel."""
+
+import pandas as pd
+import pytest
+
+from irish_charities import parallel
+from irish_charities.clean import clean_annual_reports
+from irish_charities.load import read_annual_reports
+from irish_charities.period import ReportingPeriod, ReportingYears
+
+# Every data row but the last holds a quoted newline, one of them next to
+# escaped quotes, so most byte offsets fall inside a quoted field.
+QUOTED = (
+    b'Effective Date,x\r\n"Registered\r\nCharity\r\nNumber",Name\r\n'
+    b'1,"a\r\nb"\r\n'
+    b'2,"c\r\n""d""\r\ne"\r\n'
+    b'3,""""\r\n'
+    b'4,x\r\n'
+)
+
+
+def _row_ends(data: bytes):
+    """Offsets just past every newline that is outside a quoted field."""
+    ends, quotes = set(), 0
+    for offset, byte in enumerate(data):
+        quotes += byte == ord('"')
+        if byte == ord("\n") and quotes % 2 == 0:
+            ends.add(offset + 1)
+    return ends
+
+
+@pytest.fixture
+def tiny_ranges(monkeypatch):
+    monkeypatch.setattr(parallel, "MIN_RANGE_BYTES", 1)
+
+
+@pytest.mark.parametrize("scan_block", [1, 2, 3, 5, 1 << 20])
+def test_quoted_newlines_never_end_a_range(tmp_path, tiny_ranges, monkeypatch, scan_block):
+    monkeypatch.setattr(parallel, "_SCAN_BLOCK", scan_block)
+    path = tmp_path / "reports.csv"
+    path.write_bytes(QUOTED)
+    header, ranges = parallel.byte_ranges(path, len(QUOTED))
+    assert header == b'Effective Date,x\r\n"Registered\r\nCharity\r\nNumber",Name\r\n'
+    assert [QUOTED[start:end] for start, end in ranges] == [
+        b'1,"a\r\nb"\r\n',
+        b'2,"c\r\n""d""\r\ne"\r\n',
+        b'3,""""\r\n',
+        b"4,x\r\n",
+    ]
+
+
+@pytest.mark.parametrize("scan_block", [7, 64, 1 << 20])
+@pytest.mark.parametrize("parts", [2, 7, 50])
+def test_byte_ranges_cover_the_file_on_row_boundaries(reports_path, tiny_ranges, monkeypatch, scan_block, parts):
+    monkeypatch.setattr(parallel, "_SCAN_BLOCK", scan_block)
+    data = reports_path.read_bytes()
+    header, ranges = parallel.byte_ranges(reports_path, parts)
+    assert header == data[: ranges[0][0]]
+    assert ranges[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert {end for _, end in ranges} <= _row_ends(data)
+    assert len(ranges) >= min(parts, 10)
+
+
+@pytest.mark.parametrize("period", [None, ReportingPeriod.calendar_year(2021), ReportingYears(2019, 2022)])
+def test_parallel_cleaning_equals_sequential(reports_path, tiny_ranges, period):
+    expected = clean_annual_reports(read_annual_reports(reports_path, period=period))
+    result = parallel.clean_annual_reports_parallel(reports_path, period, workers=3)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+@pytest.mark.filterwarnings("ignore:.*no valid period end date")
+@pytest.mark.parametrize("data_rows", [b"", b",,,,,,,,,,,,,,,,,,,,\r\n" * 3])
+def test_parallel_cleaning_without_data_rows(reports_path, tmp_path, data_rows):
+    header, _ = parallel.byte_ranges(reports_path, 1)
+    path = tmp_path / "reports.csv"
+    path.write_bytes(header + data_rows)
+    expected = clean_annual_reports(read_annual_reports(path))
+    result = parallel.clean_annual_reports_parallel(path, workers=2)
+    assert result.empty
+    pd.testing.assert_frame_equal(result, expected)
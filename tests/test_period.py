@@ -0,0 +1,44 @@
+"""Parsing reporting-year spans and selecting reports by period."""
+
+import pandas as pd
+import pytest
+
+from irish_charities.clean import clean_annual_reports
+from irish_charities.load import read_annual_reports
+from irish_charities.period import ReportingPeriod, ReportingYears
+
+
+def test_parse_span_and_single_year():
+    assert ReportingYears.parse("2014-2022") == ReportingYears(2014, 2022)
+    assert ReportingYears.parse("2021") == ReportingYears(2021, 2021)
+
+
+@pytest.mark.parametrize("text", ["abc", "2014-", "-2014", "2014-20x2"])
+def test_parse_rejects_malformed_spans(text):
+    with pytest.raises(ValueError, match="Expected a year or a span"):
+        ReportingYears.parse(text)
+
+
+def test_span_must_not_end_before_it_starts():
+    with pytest.raises(ValueError, match="ends before it starts"):
+        ReportingYears.parse("2022-2014")
+
+
+@pytest.fixture
+def unpadded_reports_path(reports_path, tmp_path):
+    """The reports fixture with some 2021 dates written without zero padding."""
+    data = reports_path.read_bytes()
+    data = data.replace(b",01/01/2021,", b",1/1/2021,", 3)
+    data = data.replace(b",01/07/2020,", b",1/07/2020,").replace(b",30/06/2021,", b",30/6/2021,")
+    path = tmp_path / "charity-annual-reports.csv"
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize("period", [ReportingPeriod.calendar_year(2021), ReportingYears(2020, 2021)])
+def test_pushdown_equals_filtering_the_parsed_reports(unpadded_reports_path, period):
+    parsed = clean_annual_reports(read_annual_reports(unpadded_reports_path))
+    expected = period.filter(parsed)
+    result = clean_annual_reports(read_annual_reports(unpadded_reports_path, period=period))
+    pd.testing.assert_index_equal(result.index, expected.index)
+    pd.testing.assert_series_equal(result["Period End Date"], expected["Period End Date"])
@@ -0,0 +1,86 @@
+"""Per-stage records of the profiler and their JSON and table reports."""
+
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from irish_charities.profiling import Profiler, resource
+
+
+def test_nested_stages_are_recorded_inner_first():
+    profiler = Profiler()
+    with profiler.stage("outer"):
+        with profiler.stage("inner") as stage:
+            stage.frame(pd.DataFrame({"a": range(10)}))
+    inner, outer = profiler.records
+    assert [inner.name, outer.name] == ["inner", "outer"]
+    assert outer.wall_seconds >= inner.wall_seconds
+    assert inner.rows == 10 and inner.frame_bytes > 0
+    assert outer.rows is None
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = Profiler(enabled=False)
+    with profiler.stage("load") as stage:
+        stage.frame(pd.DataFrame({"a": [1]}))
+    assert profiler.records == []
+
+
+def test_json_and_table_reports(tmp_path):
+    profiler = Profiler()
+    with profiler.stage("merge") as stage:
+        stage.frame(pd.DataFrame({"a": range(1234)}))
+    profiler.write_json(tmp_path / "stages.json")
+    report = json.loads((tmp_path / "stages.json").read_text())
+    assert [stage["name"] for stage in report["stages"]] == ["merge"]
+    assert report["stages"][0]["rows"] == 1234
+    assert "_frame" not in report["stages"][0]
+    assert "memory_budget" not in report
+
+    header, rule, row = profiler.table().splitlines()
+    assert header.split()[:3] == ["stage", "wall", "s"]
+    assert set(rule) <= {"-", " "}
+    assert row.startswith("merge") and "1,234" in row
+
+
+def _allocate(size):
+    return int(np.ones(size).sum())
+
+
+def test_budget_reports_the_peak_of_nested_stages():
+    profiler = Profiler(trace_memory=True)
+    with profiler.stage("analyse"):
+        with profiler.stage("allocate"):
+            _allocate(2_000_000)
+        with profiler.stage("merge") as stage:
+            stage.frame(pd.DataFrame({"a": np.arange(1000)}))
+    allocate, merge, analyse = profiler.records
+    assert allocate.traced_peak_bytes >= 16_000_000
+    assert merge.traced_peak_bytes < 16_000_000
+    # The enclosing stage's peak includes the inner stage's, though that was reset since.
+    assert analyse.traced_peak_bytes >= allocate.traced_peak_bytes
+    budget = profiler.budget()
+    assert budget["peak_stage"] in {"allocate", "analyse"}
+    assert budget["data_bytes"] == merge.frame_bytes
+    assert budget["peak_to_data"] > 16
+    assert "peak " in profiler.table().splitlines()[-1]
+    assert Profiler().budget() is None
+
+
+@pytest.mark.skipif(resource is None, reason="needs the resource module")
+def test_budget_counts_worker_processes():
+    profiler = Profiler(trace_memory=True)
+    with profiler.stage("clean in workers"):
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pool.submit(_allocate, 25_000_000).result()
+    (record,) = profiler.records
+    # The parent never held the worker's 200 MB array.
+    assert record.traced_peak_bytes < 10_000_000
+    assert record.worker_peak_rss_bytes >= 200_000_000
+    budget = profiler.budget()
+    assert budget["peak_bytes"] == budget["worker_peak_bytes"] == record.worker_peak_rss_bytes
+    assert budget["peak_stage"] == "clean in workers (worker)"
@@ -0,0 +1,41 @@
+"""Name lookups in the register."""
+
+import pytest
+
+from irish_charities.search import NameIndex
+
+NAMES = [
+    "Barnardos Republic of Ireland Company Limited By Guarantee",
+    "Barna Rowing Club",
+    "Society of St Vincent de Paul",
+    "Irish Cancer Society",
+    "Dos Amigos Trust",
+]
+
+
+@pytest.fixture
+def index():
+    return NameIndex(NAMES, range(len(NAMES)))
+
+
+@pytest.mark.parametrize("query", ["barnados", "barnardoes", "Barnardo's"])
+def test_misspelt_word_finds_a_long_name(index, query):
+    assert index.search(query, limit=1)[0].number == 0
+
+
+def test_fuzzy_matches_rank_by_contained_trigrams(index):
+    matches = index.fuzzy("irish cancer socety")
+    assert [match.number for match in matches] == [3]
+    assert matches[0].score == pytest.approx(18 / 20)
+
+
+def test_exact_and_prefix_matches_come_first(index):
+    assert [match.kind for match in index.search("st vincent de paul")] == ["prefix"]
+    assert index.exact("IRISH CANCER SOCIETY") == [3]
+
+
+def test_search_on_the_register(file_1):
+    index = NameIndex.from_register(file_1)
+    name = file_1["Registered Charity Name"].iloc[7]
+    misspelt = name[:3] + name[4:]
+    assert file_1["Registered Charity Number"].iloc[7] in [match.number for match in index.search(misspelt)]
@@ -0,0 +1,88 @@
+"""The query service and its HTTP handler, over the fixture CSVs."""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from irish_charities.period import ReportingYears
+from irish_charities.pipeline import run
+from irish_charities.service import QueryService, make_server
+from irish_charities.snapshot import SnapshotStore
+from irish_charities.textindex import TOKENISER_VERSION, TextIndex
+
+
+@pytest.fixture
+def service(offline_cache):
+    service = QueryService(ReportingYears(2018, 2022), cache=offline_cache)
+    yield service
+    service.stop()
+
+
+@pytest.fixture
+def get(service):
+    server = make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get(path):
+        url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+        try:
+            with urllib.request.urlopen(url) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as exc:
+            return exc.code, json.loads(exc.read())
+
+    yield get
+    server.shutdown()
+    server.server_close()
+
+
+def test_zero_is_passed_on_rather_than_replaced_by_the_default(get):
+    assert get("/top?n=0") == (400, {"error": "n must be at least 1"})
+    assert get("/search?q=care&limit=0") == (400, {"error": "limit must be at least 1"})
+    status, body = get("/outliers?k=0")
+    assert status == 200
+    fences = body["fences"][0]
+    assert (fences["lower_limit"], fences["upper_limit"]) == (fences["Q1"], fences["Q3"])
+
+
+def test_defaults_apply_when_parameters_are_absent(get):
+    status, rows = get("/top")
+    assert status == 200 and len(rows) == 5
+    assert get("/outliers?k=-1") == (400, {"error": "k must not be negative"})
+
+
+def test_reload_failures_are_logged(service, monkeypatch, caplog):
+    def unavailable(url):
+        raise OSError("regulator unreachable")
+
+    monkeypatch.setattr(service.cache, "fetch", unavailable)
+    with caplog.at_level("WARNING", logger="irish_charities.service"):
+        service.watch(0.01)
+        deadline = time.monotonic() + 5
+        while not caplog.records and time.monotonic() < deadline:
+            time.sleep(0.01)
+        service.stop()
+    record = caplog.records[0]
+    assert record.getMessage().startswith("Reload failed; still serving the data loaded at")
+    assert "regulator unreachable" in str(record.exc_info[1])
+
+
+def test_service_maps_the_text_postings_built_with_the_snapshots(tmp_path, monkeypatch, offline_cache):
+    pytest.importorskip("pyarrow")
+    snapshots = SnapshotStore(tmp_path / "snapshots")
+    period = ReportingYears(2018, 2022)
+    run(period, cache=offline_cache, snapshots=snapshots)
+    paths = snapshots.directory.glob(f"text-*-t{TOKENISER_VERSION}.arrow")
+    names = sorted(path.name.rsplit("-", 3)[0] for path in paths)
+    assert names == [f"text-activities_{period.key}", "text-objects"]
+
+    def rebuilt(*args, **kwargs):
+        raise AssertionError("the postings should have been loaded from the snapshots")
+
+    monkeypatch.setattr(TextIndex, "from_frame", rebuilt)
+    service = QueryService(period, cache=offline_cache, snapshots=snapshots)
+    assert json.loads(service.text("community"))
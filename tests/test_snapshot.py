@@ -0,0 +1,84 @@
+"""Arrow snapshots of the cleaned frames and their invalidation."""
+
+import shutil
+
+import pandas as pd
+import pytest
+
+from irish_charities import snapshot, textindex
+from irish_charities.snapshot import SnapshotStore, read_arrow, write_arrow
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def source(tmp_path, register_path):
+    path = tmp_path / "register-of-charities.csv"
+    shutil.copyfile(register_path, path)
+    return path
+
+
+class _Build:
+    """Counts how often the snapshot is built."""
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return self.frame
+
+
+def test_round_trip_keeps_index_and_dtypes(tmp_path, file_1):
+    frame = file_1.set_index(file_1.index * 3 + 7)
+    write_arrow(tmp_path / "file_1.arrow", frame)
+    pd.testing.assert_frame_equal(read_arrow(tmp_path / "file_1.arrow"), frame)
+    assert not list(tmp_path.glob(".partial-*"))
+
+
+def test_snapshot_is_built_once_per_source_version(tmp_path, source, file_1):
+    store, build = SnapshotStore(tmp_path / "snapshots"), _Build(file_1)
+    first = store.get_or_build("register", source, build)
+    second = store.get_or_build("register", source, build)
+    assert build.calls == 1
+    pd.testing.assert_frame_equal(second, first)
+
+    with open(source, "ab") as fh:
+        fh.write(b",,,,,,,,,,\r\n")
+    store.get_or_build("register", source, build)
+    assert build.calls == 2
+    assert len(list(store.directory.glob("register-*.arrow"))) == 1
+
+
+def test_new_cleaning_version_rebuilds_and_removes_the_stale_snapshot(tmp_path, source, file_1, monkeypatch):
+    store, build = SnapshotStore(tmp_path / "snapshots"), _Build(file_1)
+    old_path = store.save("register", snapshot.source_version(source), file_1)
+    store.save("reports_2021", "other-source", file_1)
+    monkeypatch.setattr(snapshot, "CLEANING_VERSION", snapshot.CLEANING_VERSION + "-next")
+    store.get_or_build("register", source, build)
+    assert build.calls == 1
+    assert not old_path.exists()
+    assert sorted(path.name.split("-")[0] for path in store.directory.glob("*.arrow")) == ["register", "reports_2021"]
+
+
+def test_new_tag_removes_the_snapshot_of_the_old_tag(tmp_path, source, file_1):
+    store, build = SnapshotStore(tmp_path / "snapshots"), _Build(file_1)
+    old_path = store.path_for("text-objects", snapshot.source_version(source), "t1")
+    store.get_or_build("text-objects", source, build, tag="t1")
+    store.get_or_build("text-objects", source, build, tag="t2")
+    assert build.calls == 2
+    assert not old_path.exists()
+    assert [path.name.endswith("-t2.arrow") for path in store.directory.glob("*.arrow")] == [True]
+
+
+def test_text_postings_follow_the_tokeniser_version(tmp_path, source, file_1, monkeypatch):
+    store = SnapshotStore(tmp_path / "snapshots")
+    sources = type("Sources", (), {"register": source})
+    monkeypatch.setattr(textindex, "TEXT_FIELDS", {"objects": ("register", "Charitable Objects")})
+    textindex.text_postings(file_1, None, sources, snapshots=store)
+    monkeypatch.setattr(textindex, "TOKENISER_VERSION", textindex.TOKENISER_VERSION + 1)
+    textindex.text_postings(file_1, None, sources, snapshots=store)
+    (path,) = store.directory.glob("*.arrow")
+    assert path.name.startswith("text-objects-")
+    assert path.name.endswith(f"-t{textindex.TOKENISER_VERSION}.arrow")
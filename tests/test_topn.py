@@ -0,0 +1,41 @@
+"""Rankings streamed chunk by chunk against pandas on the whole merged frame."""
+
+import pandas as pd
+import pytest
+
+from irish_charities.clean import clean_annual_reports
+from irish_charities.columns import REPORTING_YEAR
+from irish_charities.load import read_annual_reports
+from irish_charities.merge import NET_INCOME, add_derived_columns, merge
+from irish_charities.period import ReportingPeriod, ReportingYears
+from irish_charities.topn import Ranking, stream_top_n, top_n
+
+RANKINGS = [
+    Ranking("Total Gross Income"),
+    Ranking(NET_INCOME, ascending=True),
+    Ranking("Income: Donations"),
+    Ranking("Total Gross Income", by=REPORTING_YEAR),
+    Ranking(NET_INCOME, ascending=True, by=REPORTING_YEAR),
+]
+
+
+def _expected(file_3, ranking, n):
+    if ranking.by is None:
+        pick = file_3.nsmallest if ranking.ascending else file_3.nlargest
+        return pick(n, ranking.measure, keep="first")
+    ranked = file_3.dropna(subset=[ranking.measure]).sort_values(
+        [ranking.by, ranking.measure], ascending=[True, ranking.ascending], kind="stable"
+    )
+    return ranked.groupby(ranking.by, sort=False).head(n)
+
+
+@pytest.mark.parametrize("period", [ReportingPeriod.calendar_year(2021), ReportingYears(2018, 2022)])
+@pytest.mark.parametrize("chunksize", [7, 1000])
+def test_stream_top_n_matches_pandas(file_1, reports_path, period, chunksize):
+    file_3 = add_derived_columns(merge(file_1, clean_annual_reports(read_annual_reports(reports_path, period=period))))
+    streamed = stream_top_n(file_1, reports_path, RANKINGS, period=period, n=5, chunksize=chunksize)
+    in_memory = top_n(file_3, RANKINGS, n=5)
+    for ranking in RANKINGS:
+        expected = _expected(file_3, ranking, 5)
+        pd.testing.assert_frame_equal(in_memory[ranking], expected)
+        pd.testing.assert_frame_equal(streamed[ranking], expected)